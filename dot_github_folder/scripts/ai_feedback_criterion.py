@@ -15,6 +15,7 @@ from typing import Dict, Any, Tuple, List, Optional
 
 # Add parent dir to path to allow local imports
 sys.path.append(str(Path(__file__).parent))
+from yaml_loader import SafeLoader
 from section_extractor import extract_sections_for_criterion_ai
 from image_utils import encode_image_to_base64, optimize_images_for_payload
 
@@ -37,7 +38,7 @@ def load_config():
     """Load course-specific configuration."""
     try:
         with open('.github/config.yml') as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=SafeLoader)
     except Exception as e:
         print(f"ERROR: Failed to load config: {e}", file=sys.stderr)
         sys.exit(1)
@@ -47,7 +48,7 @@ def load_rubric():
     """Load machine-readable rubric."""
     try:
         with open('.github/feedback/rubric.yml') as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=SafeLoader)
     except Exception as e:
         print(f"ERROR: Failed to load rubric: {e}", file=sys.stderr)
         sys.exit(1)
@@ -10,6 +10,8 @@ import requests
 import sys
 from datetime import datetime
 
+from yaml_loader import SafeLoader
+
 def create_github_issue(title: str, body: str, label: str):
     """Create a GitHub issue using the API."""
     token = os.environ.get('GITHUB_TOKEN')
@@ -130,10 +132,10 @@ def main():
     is_local_test = os.environ.get('LOCAL_TEST', 'false').lower() == 'true'
 
     try:
-        with open('.github/config.yml', 'r', encoding='utf-8') as f: config = yaml.safe_load(f)
+        with open('.github/config.yml', 'r', encoding='utf-8') as f: config = yaml.load(f, Loader=SafeLoader)
         with open('feedback.json', 'r', encoding='utf-8') as f: feedback_data = json.load(f)
         with open('parsed_report.json', 'r', encoding='utf-8') as f: report_data = json.load(f)
-        with open('.github/feedback/rubric.yml', 'r', encoding='utf-8') as f: rubric_data = yaml.safe_load(f)
+        with open('.github/feedback/rubric.yml', 'r', encoding='utf-8') as f: rubric_data = yaml.load(f, Loader=SafeLoader)
     except FileNotFoundError as e:
         print(f"ERROR: Missing required file: {e.filename}", file=sys.stderr)
         sys.exit(1)
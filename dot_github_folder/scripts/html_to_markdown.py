@@ -5,9 +5,55 @@ Converts HTML tables and formatted content to clean markdown for AI analysis.
 """
 
 import re
+from functools import lru_cache
 from html.parser import HTMLParser
 from typing import List, Tuple
 
+_FLAGS = re.DOTALL | re.IGNORECASE
+
+STYLE_PATTERN = re.compile(r'<style[^>]*>.*?</style>', _FLAGS)
+SCRIPT_PATTERN = re.compile(r'<script[^>]*>.*?</script>', _FLAGS)
+DIV_PATTERN = re.compile(r'</?div[^>]*>', re.IGNORECASE)
+TABLE_PATTERN = re.compile(r'<table[^>]*>.*?</table>', _FLAGS)
+LIST_ITEM_PATTERN = re.compile(r'<li[^>]*>(.*?)</li>', _FLAGS)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+BLANK_LINES_PATTERN = re.compile(r'\n\n\n+')
+
+# HTML formatting -> markdown, applied in order
+CONVERSIONS = [(re.compile(pattern, _FLAGS), replacement) for pattern, replacement in [
+    # Headers
+    (r'<h1[^>]*>(.*?)</h1>', r'# \1'),
+    (r'<h2[^>]*>(.*?)</h2>', r'## \1'),
+    (r'<h3[^>]*>(.*?)</h3>', r'### \1'),
+    (r'<h4[^>]*>(.*?)</h4>', r'#### \1'),
+
+    # Text formatting
+    (r'<strong[^>]*>(.*?)</strong>', r'**\1**'),
+    (r'<b[^>]*>(.*?)</b>', r'**\1**'),
+    (r'<em[^>]*>(.*?)</em>', r'*\1*'),
+    (r'<i[^>]*>(.*?)</i>', r'*\1*'),
+    (r'<code[^>]*>(.*?)</code>', r'`\1`'),
+
+    # Links
+    (r'<a[^>]*href=["\']([^"\']*)["\'][^>]*>(.*?)</a>', r'[\2](\1)'),
+
+    # Line breaks and paragraphs
+    (r'<br\s*/?>', '\n'),
+    (r'<p[^>]*>(.*?)</p>', r'\1\n\n'),
+
+    # Lists
+    (r'<ul[^>]*>(.*?)</ul>', lambda m: convert_list(m.group(1), ordered=False)),
+    (r'<ol[^>]*>(.*?)</ol>', lambda m: convert_list(m.group(1), ordered=True)),
+
+    # Code blocks
+    (r'<pre[^>]*><code[^>]*>(.*?)</code></pre>', r'\n```\n\1\n```\n'),
+    (r'<pre[^>]*>(.*?)</pre>', r'\n```\n\1\n```\n'),
+]]
+
+# Notebook output formats that need no conversion: plain text is already plain
+# and models read markdown and LaTeX directly
+PASSTHROUGH_OUTPUT_KEYS = ('text', 'markdown', 'latex')
+
 
 class TableToMarkdown(HTMLParser):
     """Converts HTML tables to markdown format."""
@@ -44,10 +90,11 @@ class TableToMarkdown(HTMLParser):
         elif tag == 'tr':
             self.in_row = False
             if self.current_row:
+                # Hand the row over rather than copying it; a new one starts below
                 if self.in_header:
-                    self.header_rows.append(self.current_row[:])
+                    self.header_rows.append(self.current_row)
                 else:
-                    self.rows.append(self.current_row[:])
+                    self.rows.append(self.current_row)
                 self.current_row = []
         elif tag in ('th', 'td'):
             self.in_cell = False
@@ -75,14 +122,14 @@ class TableToMarkdown(HTMLParser):
             lines.append('| ' + ' | '.join(['---'] * len(header_row)) + ' |')
 
         # If no header, but we have data, use the first row as header
+        rows = iter(self.rows)
         if not self.header_rows and self.rows:
-            first_row = self.rows[0]
+            first_row = next(rows)
             lines.append('| ' + ' | '.join(first_row) + ' |')
             lines.append('| ' + ' | '.join(['---'] * len(first_row)) + ' |')
-            self.rows = self.rows[1:]
 
         # Add data rows
-        for row in self.rows:
+        for row in rows:
             lines.append('| ' + ' | '.join(row) + ' |')
 
         return '\n'.join(lines)
@@ -124,71 +171,30 @@ def html_to_markdown(html: str) -> str:
         return ""
 
     # Remove style tags and their contents (pandas DataFrames include CSS)
-    html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
+    html = STYLE_PATTERN.sub('', html)
 
     # Remove script tags and their contents
-    html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
+    html = SCRIPT_PATTERN.sub('', html)
 
     # Remove div wrappers (pandas uses <div> around tables)
-    html = re.sub(r'<div[^>]*>', '', html, flags=re.IGNORECASE)
-    html = re.sub(r'</div>', '', html, flags=re.IGNORECASE)
+    html = DIV_PATTERN.sub('', html)
 
-    # First, check if it's primarily a table
-    if '<table' in html.lower():
-        # Extract and convert tables
-        table_pattern = r'<table[^>]*>.*?</table>'
-        tables = re.findall(table_pattern, html, re.DOTALL | re.IGNORECASE)
-
-        result = html
-        for table_html in tables:
-            table_md = html_table_to_markdown(table_html)
-            result = result.replace(table_html, f'\n{table_md}\n')
-
-        html = result
+    # Extract and convert tables (each distinct table is parsed once; replace()
+    # already substitutes every copy of it)
+    for table_html in dict.fromkeys(TABLE_PATTERN.findall(html)):
+        table_md = html_table_to_markdown(table_html)
+        html = html.replace(table_html, f'\n{table_md}\n')
 
     # Convert common HTML formatting to markdown
-    conversions = [
-        # Headers
-        (r'<h1[^>]*>(.*?)</h1>', r'# \1'),
-        (r'<h2[^>]*>(.*?)</h2>', r'## \1'),
-        (r'<h3[^>]*>(.*?)</h3>', r'### \1'),
-        (r'<h4[^>]*>(.*?)</h4>', r'#### \1'),
-
-        # Text formatting
-        (r'<strong[^>]*>(.*?)</strong>', r'**\1**'),
-        (r'<b[^>]*>(.*?)</b>', r'**\1**'),
-        (r'<em[^>]*>(.*?)</em>', r'*\1*'),
-        (r'<i[^>]*>(.*?)</i>', r'*\1*'),
-        (r'<code[^>]*>(.*?)</code>', r'`\1`'),
-
-        # Links
-        (r'<a[^>]*href=["\']([^"\']*)["\'][^>]*>(.*?)</a>', r'[\2](\1)'),
-
-        # Line breaks and paragraphs
-        (r'<br\s*/?>', '\n'),
-        (r'<p[^>]*>(.*?)</p>', r'\1\n\n'),
-
-        # Lists
-        (r'<ul[^>]*>(.*?)</ul>', lambda m: convert_list(m.group(1), ordered=False)),
-        (r'<ol[^>]*>(.*?)</ol>', lambda m: convert_list(m.group(1), ordered=True)),
-
-        # Code blocks
-        (r'<pre[^>]*><code[^>]*>(.*?)</code></pre>', r'\n```\n\1\n```\n'),
-        (r'<pre[^>]*>(.*?)</pre>', r'\n```\n\1\n```\n'),
-    ]
-
     text = html
-    for pattern, replacement in conversions:
-        if callable(replacement):
-            text = re.sub(pattern, replacement, text, flags=re.DOTALL | re.IGNORECASE)
-        else:
-            text = re.sub(pattern, replacement, text, flags=re.DOTALL | re.IGNORECASE)
+    for pattern, replacement in CONVERSIONS:
+        text = pattern.sub(replacement, text)
 
     # Remove remaining HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
+    text = TAG_PATTERN.sub('', text)
 
     # Clean up excessive whitespace
-    text = re.sub(r'\n\n\n+', '\n\n', text)
+    text = BLANK_LINES_PATTERN.sub('\n\n', text)
     text = text.strip()
 
     return text
@@ -196,12 +202,12 @@ def html_to_markdown(html: str) -> str:
 
 def convert_list(html: str, ordered: bool = False) -> str:
     """Convert HTML list items to markdown list."""
-    items = re.findall(r'<li[^>]*>(.*?)</li>', html, re.DOTALL | re.IGNORECASE)
+    items = LIST_ITEM_PATTERN.findall(html)
 
     result = []
     for i, item in enumerate(items):
         # Remove nested tags from item
-        item_text = re.sub(r'<[^>]+>', '', item).strip()
+        item_text = TAG_PATTERN.sub('', item).strip()
 
         if ordered:
             result.append(f"{i+1}. {item_text}")
@@ -211,6 +217,12 @@ def convert_list(html: str, ordered: bool = False) -> str:
     return '\n' + '\n'.join(result) + '\n'
 
 
+@lru_cache(maxsize=256)
+def _html_to_markdown_cached(html: str) -> str:
+    """html_to_markdown, memoized for outputs repeated across cells and criteria."""
+    return html_to_markdown(html)
+
+
 def convert_notebook_output_to_markdown(output_data: dict) -> dict:
     """
     Convert various notebook output formats to markdown.
@@ -227,21 +239,15 @@ def convert_notebook_output_to_markdown(output_data: dict) -> dict:
     if output_data.get('html'):
         converted['html_as_markdown'] = []
         for html in output_data['html']:
-            md = html_to_markdown(html)
+            md = _html_to_markdown_cached(html)
             if md:
                 converted['html_as_markdown'].append(md)
 
-    # Text -> keep as-is (it's already plain)
-    if output_data.get('text'):
-        converted['text'] = output_data['text']
-
-    # Markdown -> keep as-is
-    if output_data.get('markdown'):
-        converted['markdown'] = output_data['markdown']
-
-    # LaTeX -> keep as-is (models understand LaTeX)
-    if output_data.get('latex'):
-        converted['latex'] = output_data['latex']
+    # Text, markdown and LaTeX -> keep as-is
+    for key in PASSTHROUGH_OUTPUT_KEYS:
+        value = output_data.get(key)
+        if value:
+            converted[key] = value
 
     return converted
 
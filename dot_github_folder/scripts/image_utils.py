@@ -8,6 +8,8 @@ import base64
 import io
 import os
 import mimetypes
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple, List, Dict
 
@@ -25,6 +27,11 @@ MIN_RESOLUTION = 256  # Below this, images become illegible
 MIN_QUALITY = 65  # Below this, compression artifacts become noticeable
 BASE64_OVERHEAD = 1.33  # 33% size increase from base64 encoding
 JSON_OVERHEAD_BYTES = 10_000  # ~10KB for JSON structure
+JPEG_DATA_URI_PREFIX = "data:image/jpeg;base64,"
+
+# Image extensions accepted by validate_image_file (display order + fast lookup)
+SUPPORTED_IMAGE_FORMATS_DISPLAY = ['png', 'jpg', 'jpeg', 'gif', 'webp']
+SUPPORTED_IMAGE_FORMATS = frozenset(SUPPORTED_IMAGE_FORMATS_DISPLAY)
 
 
 def encode_image_simple(image_path: str) -> Optional[str]:
@@ -86,7 +93,7 @@ def encode_image_to_base64(image_path: str, max_dimension: Optional[int] = None,
             if img.mode == 'RGBA':
                 # Create white background
                 rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                rgb_img.paste(img, mask=img.split()[3])  # Use alpha channel as mask
+                rgb_img.paste(img, mask=img.getchannel('A'))  # Use alpha channel as mask
                 img = rgb_img
             elif img.mode not in ('RGB', 'L'):  # L is grayscale
                 img = img.convert('RGB')
@@ -164,7 +171,43 @@ def get_image_info(image_path: str) -> dict:
         return {'exists': False, 'error': str(e)}
 
 
-def estimate_image_tokens(image_path: str, max_dimension: Optional[int] = None) -> int:
+def tokens_for_dimensions(width: int, height: int, max_dimension: Optional[int] = None) -> int:
+    """
+    Estimate token cost for an image of a known size.
+
+    Pure integer arithmetic, so no file access or PIL is needed.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        max_dimension: If provided, estimate after resizing
+
+    Returns:
+        Estimated token count
+    """
+    # Apply resizing if specified
+    if max_dimension and (width > max_dimension or height > max_dimension):
+        if width > height:
+            width, height = max_dimension, height * max_dimension // width
+        else:
+            width, height = width * max_dimension // height, max_dimension
+
+    # Scale to fit within 2048x2048 (GPT-4V limit)
+    if width > 2048 or height > 2048:
+        if width > height:
+            width, height = 2048, height * 2048 // width
+        else:
+            width, height = width * 2048 // height, 2048
+
+    # Base cost for any image + 170 tokens per 512x512 tile (ceiling division)
+    return 85 + 170 * (((width + 511) // 512) * ((height + 511) // 512))
+
+
+def estimate_image_tokens(
+    image_path: str,
+    max_dimension: Optional[int] = None,
+    dimensions: Optional[Tuple[int, int]] = None
+) -> int:
     """
     Estimate token cost for an image in GPT-4V.
 
@@ -174,10 +217,14 @@ def estimate_image_tokens(image_path: str, max_dimension: Optional[int] = None)
     Args:
         image_path: Path to the image file
         max_dimension: If provided, estimate after resizing
+        dimensions: Optional known (width, height); skips opening the file
 
     Returns:
         Estimated token count
     """
+    if dimensions is not None:
+        return tokens_for_dimensions(dimensions[0], dimensions[1], max_dimension)
+
     try:
         if not Path(image_path).exists():
             return 0
@@ -188,37 +235,11 @@ def estimate_image_tokens(image_path: str, max_dimension: Optional[int] = None)
             # Rough estimate: ~1 token per 500 bytes of image data
             return 85 + (file_size // 500)
 
+        # Image.open only reads the header, which is all the size needs
         with Image.open(image_path) as img:
             width, height = img.size
 
-            # Apply resizing if specified
-            if max_dimension and (width > max_dimension or height > max_dimension):
-                if width > height:
-                    width = max_dimension
-                    height = int(img.height * (max_dimension / img.width))
-                else:
-                    height = max_dimension
-                    width = int(img.width * (max_dimension / img.height))
-
-            # Scale to fit within 2048x2048 (GPT-4V limit)
-            if width > 2048 or height > 2048:
-                if width > height:
-                    height = int(height * (2048 / width))
-                    width = 2048
-                else:
-                    width = int(width * (2048 / height))
-                    height = 2048
-
-            # Calculate number of 512x512 tiles
-            tiles_wide = (width + 511) // 512  # Ceiling division
-            tiles_high = (height + 511) // 512
-            num_tiles = tiles_wide * tiles_high
-
-            # Base token cost + per-tile cost
-            base_tokens = 85  # Base cost for any image
-            tile_tokens = num_tiles * 170  # Cost per tile
-
-            return base_tokens + tile_tokens
+        return tokens_for_dimensions(width, height, max_dimension)
 
     except Exception as e:
         print(f"WARNING: Could not estimate tokens for {image_path}: {e}")
@@ -271,7 +292,7 @@ def encode_image_to_jpeg(img: Image, quality: int = 85) -> bytes:
         # Handle RGBA → RGB
         if img.mode == 'RGBA':
             rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-            rgb_img.paste(img, mask=img.split()[3])
+            rgb_img.paste(img, mask=img.getchannel('A'))
             img = rgb_img
         # Handle CMYK → RGB
         elif img.mode == 'CMYK':
@@ -293,10 +314,46 @@ def encode_image_to_jpeg(img: Image, quality: int = 85) -> bytes:
         return None
 
 
+def _resize_to_fit(img: Image, max_dimension: Optional[int]) -> Image:
+    """Return img scaled down to fit max_dimension (preserving aspect ratio), or img unchanged."""
+    if max_dimension and (img.width > max_dimension or img.height > max_dimension):
+        if img.width > img.height:
+            new_width = max_dimension
+            new_height = int(img.height * (max_dimension / img.width))
+        else:
+            new_height = max_dimension
+            new_width = int(img.width * (max_dimension / img.height))
+        # JPEG decoders can downscale by 1/2, 1/4 or 1/8 during decoding; draft()
+        # picks the largest such scale that stays at or above the target size
+        # (no-op for other formats and already-loaded images)
+        img.draft(None, (new_width, new_height))
+        return img.resize((new_width, new_height), _resample_filter(max(img.size) / max_dimension))
+    return img
+
+
+def _resample_filter(ratio: float) -> int:
+    """
+    Pick a downscaling filter for a given source/target size ratio.
+
+    Images are re-encoded as JPEG at quality 65-85 afterwards, so for large
+    reductions the much cheaper box (area average) and bilinear filters look
+    the same as Lanczos.
+    """
+    if ratio >= 2:
+        return Image.Resampling.BOX
+    if ratio >= 1.5:
+        return Image.Resampling.BILINEAR
+    return Image.Resampling.LANCZOS
+
+
 def estimate_jpeg_size(image_path: str, max_dimension: Optional[int] = None, quality: int = 85) -> int:
     """
     Estimate JPEG file size by actually encoding the image.
 
+    Results are cached per file version (mtime and size), so repeated
+    estimates at the same settings skip the decode and re-encode. JPEG files
+    estimated at full size and quality >= 85 use the file size directly.
+
     Args:
         image_path: Path to the image file
         max_dimension: Optional max width/height (preserves aspect ratio)
@@ -306,24 +363,35 @@ def estimate_jpeg_size(image_path: str, max_dimension: Optional[int] = None, qua
         Estimated size in bytes (including base64 overhead)
     """
     try:
-        if not Path(image_path).exists():
-            return 0
-
+        stat = os.stat(image_path)
+    except OSError:
+        return 0
+
+    # An existing JPEG kept at full size and high quality is already about the
+    # size a re-encode would produce, so skip the decode
+    if (max_dimension is None and quality >= 85
+            and os.path.splitext(image_path)[1].lower() in ('.jpg', '.jpeg')):
+        return int(stat.st_size * BASE64_OVERHEAD)
+
+    return _estimate_jpeg_size(image_path, stat.st_mtime_ns, stat.st_size, max_dimension, quality)
+
+
+@lru_cache(maxsize=512)
+def _estimate_jpeg_size(
+    image_path: str,
+    mtime_ns: int,
+    file_size: int,
+    max_dimension: Optional[int],
+    quality: int
+) -> int:
+    """estimate_jpeg_size for one version of a file; mtime_ns/file_size are part of the cache key."""
+    try:
         if not HAS_PIL:
             # Without PIL, return conservative estimate
-            file_size = os.path.getsize(image_path)
             return int(file_size * BASE64_OVERHEAD)
 
         with Image.open(image_path) as img:
-            # Resize if needed
-            if max_dimension and (img.width > max_dimension or img.height > max_dimension):
-                if img.width > img.height:
-                    new_width = max_dimension
-                    new_height = int(img.height * (max_dimension / img.width))
-                else:
-                    new_height = max_dimension
-                    new_width = int(img.width * (max_dimension / img.height))
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            img = _resize_to_fit(img, max_dimension)
 
             # Convert to JPEG and measure
             jpeg_bytes = encode_image_to_jpeg(img, quality)
@@ -331,15 +399,12 @@ def estimate_jpeg_size(image_path: str, max_dimension: Optional[int] = None, qua
                 # Add base64 overhead (33%)
                 return int(len(jpeg_bytes) * BASE64_OVERHEAD)
             else:
-                return int(os.path.getsize(image_path) * BASE64_OVERHEAD)
+                return int(file_size * BASE64_OVERHEAD)
 
     except Exception as e:
         print(f"WARNING: Could not estimate size for {image_path}: {e}")
         # Conservative estimate
-        try:
-            return int(os.path.getsize(image_path) * BASE64_OVERHEAD)
-        except:
-            return 100_000  # 100KB fallback
+        return int(file_size * BASE64_OVERHEAD)
 
 
 def estimate_total_payload_size(text_size_bytes: int, image_base64_list: List[str]) -> int:
@@ -357,6 +422,60 @@ def estimate_total_payload_size(text_size_bytes: int, image_base64_list: List[st
     return text_size_bytes + image_size + JSON_OVERHEAD_BYTES
 
 
+def _encode_payload_image(
+    img_path: str,
+    resolution: int,
+    quality: int,
+    resized_images: Dict[Tuple[str, int], Image]
+) -> Tuple[Optional[bytes], Optional[int]]:
+    """
+    Resize and JPEG-encode one image for the API payload.
+
+    Returns (jpeg_bytes, quality). quality is None when the file is sent as-is,
+    since its bytes keep whatever quality it was saved with.
+
+    The resized image is stored in resized_images under (img_path, resolution)
+    so other quality levels at the same resolution skip the decode and resize.
+    An RGB or grayscale JPEG that already fits is sent as-is at quality >= 85,
+    unless it carries EXIF/XMP (APP1) metadata: that can hold GPS coordinates and
+    an orientation tag, so such files are re-encoded, which drops it.
+    """
+    if quality >= 85 and os.path.splitext(img_path)[1].lower() in ('.jpg', '.jpeg'):
+        with Image.open(img_path) as img:
+            passthrough = (img.format == 'JPEG' and img.mode in ('RGB', 'L')
+                           and img.width <= resolution and img.height <= resolution
+                           and not any(marker == 'APP1' for marker, _ in img.applist))
+        if passthrough:
+            with open(img_path, 'rb') as f:
+                return f.read(), None
+
+    resized_key = (img_path, resolution)
+    if resized_key not in resized_images:
+        with Image.open(img_path) as img:
+            # Resize if needed (copy so the pixels outlive the file handle)
+            resized = _resize_to_fit(img, resolution)
+            resized_images[resized_key] = resized if resized is not img else img.copy()
+
+    return encode_image_to_jpeg(resized_images[resized_key], quality), quality
+
+
+def _settle_pending_encodes(encoded_images: Dict[Tuple[str, int, int], object]) -> None:
+    """
+    Cancel queued encodes and wait for running ones left over from a step that broke early.
+
+    Different qualities at one resolution share a cached resized image, and Pillow keeps
+    the save options on the image object, so two encodes of it must never overlap.
+    """
+    running = []
+    for encoded_key, value in list(encoded_images.items()):
+        if isinstance(value, Future):
+            if value.cancel():
+                del encoded_images[encoded_key]
+            else:
+                running.append(value)
+    wait(running)
+
+
 def optimize_images_for_payload(
     image_paths: List[str],
     text_size_bytes: int,
@@ -384,7 +503,7 @@ def optimize_images_for_payload(
                 'base64_data': str (data:image/jpeg;base64,...),
                 'size_bytes': int,
                 'resolution': int,
-                'quality': int
+                'quality': int (None if a JPEG was sent without re-encoding)
             }
         ]
     """
@@ -409,77 +528,103 @@ def optimize_images_for_payload(
         {'quality': 65, 'resolution': 384, 'drop_count': 0, 'description': 'Resolution→384'},
     ]
 
-    # Try each optimization step, then drop images one by one
-    for drop_count in range(len(image_paths)):
-        images_to_try = image_paths[:len(image_paths) - drop_count]
-
-        for step in optimization_steps:
-            if step['drop_count'] != drop_count:
-                step['drop_count'] = drop_count
-
-            # Try to fit images with this configuration
-            optimized_images = []
-            total_size = 0
-
-            for img_path in images_to_try:
-                try:
-                    with Image.open(img_path) as img:
-                        # Resize if needed
-                        resolution = step['resolution']
-                        if img.width > resolution or img.height > resolution:
-                            if img.width > img.height:
-                                new_width = resolution
-                                new_height = int(img.height * (resolution / img.width))
-                            else:
-                                new_height = resolution
-                                new_width = int(img.width * (resolution / img.height))
-                            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                        else:
-                            new_width, new_height = img.width, img.height
+    # Each image is opened and resized once per resolution, and encoded once per
+    # (resolution, quality); later steps and drop counts reuse the results
+    resized_images = {}
+    encoded_images = {}
+
+    # Encode independent images on worker threads (Pillow releases the GIL while
+    # resizing and encoding); the budget decisions below stay sequential
+    max_workers = min(len(image_paths), os.cpu_count() or 1)
+    executor = ThreadPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
 
-                        # Convert to JPEG
-                        jpeg_bytes = encode_image_to_jpeg(img, step['quality'])
+    try:
+        # Try each optimization step, then drop images one by one
+        for drop_count in range(len(image_paths)):
+            images_to_try = image_paths[:len(image_paths) - drop_count]
+
+            for step in optimization_steps:
+                if step['drop_count'] != drop_count:
+                    step['drop_count'] = drop_count
+
+                # Try to fit images with this configuration
+                optimized_images = []
+                selected_jpegs = []
+                total_size = 0
+
+                resolution = step['resolution']
+                quality = step['quality']
+
+                if executor is not None:
+                    _settle_pending_encodes(encoded_images)
+                    for img_path in images_to_try:
+                        encoded_key = (img_path, resolution, quality)
+                        if encoded_key not in encoded_images:
+                            encoded_images[encoded_key] = executor.submit(
+                                _encode_payload_image, img_path, resolution, quality, resized_images
+                            )
+
+                for img_path in images_to_try:
+                    try:
+                        encoded_key = (img_path, resolution, quality)
+                        if encoded_key not in encoded_images:
+                            encoded_images[encoded_key] = _encode_payload_image(
+                                img_path, resolution, quality, resized_images
+                            )
+
+                        encoded = encoded_images[encoded_key]
+                        if isinstance(encoded, Future):
+                            encoded = encoded_images[encoded_key] = encoded.result()
+                        jpeg_bytes, encoded_quality = encoded
                         if not jpeg_bytes:
                             continue
 
-                        # Encode to base64
-                        base64_str = base64.b64encode(jpeg_bytes).decode('utf-8')
-                        base64_data = f"data:image/jpeg;base64,{base64_str}"
-
-                        size_with_overhead = len(base64_data)
+                        # Length of the data URI, without building the base64 string yet
+                        size_with_overhead = len(JPEG_DATA_URI_PREFIX) + (len(jpeg_bytes) + 2) // 3 * 4
 
                         # Check if adding this image stays under budget
                         if total_size + size_with_overhead <= available_bytes:
                             optimized_images.append({
                                 'path': img_path,
-                                'base64_data': base64_data,
+                                'base64_data': None,  # Filled in once the config is chosen
                                 'size_bytes': size_with_overhead,
                                 'resolution': resolution,
-                                'quality': step['quality']
+                                'quality': encoded_quality
                             })
+                            selected_jpegs.append(jpeg_bytes)
                             total_size += size_with_overhead
-                        # If we can't add this image with current params, stop trying for this config
-                        elif optimized_images:
+                        # A config only succeeds if every image fits, so stop encoding the
+                        # rest as soon as one doesn't
+                        else:
                             break
 
-                except Exception as e:
-                    print(f"   WARNING: Could not process {Path(img_path).name}: {e}")
-                    continue
-
-            # Check if this configuration fits all requested images
-            if len(optimized_images) == len(images_to_try):
-                # Success! All images fit with this configuration
-                total_payload = text_size_bytes + total_size + JSON_OVERHEAD_BYTES
-                final_mb = total_payload / (1024 * 1024)
+                    except Exception as e:
+                        print(f"   WARNING: Could not process {Path(img_path).name}: {e}")
+                        continue
+
+                # Check if this configuration fits all requested images
+                if len(optimized_images) == len(images_to_try):
+                    # Success! All images fit with this configuration
+                    total_payload = text_size_bytes + total_size + JSON_OVERHEAD_BYTES
+                    final_mb = total_payload / (1024 * 1024)
+
+                    if drop_count > 0:
+                        print(f"   ⚠️  Optimized: {step['description']}, {len(optimized_images)} images: {final_mb:.2f}MB")
+                    elif step['quality'] < 85 or step['resolution'] < initial_resolution:
+                        print(f"   ⚠️  Optimized: {step['description']}: {final_mb:.2f}MB")
+                    else:
+                        print(f"   ✅ Payload: {final_mb:.2f}MB ({len(optimized_images)} images)")
+
+                    # Base64-encode only the images that were selected
+                    for optimized, jpeg_bytes in zip(optimized_images, selected_jpegs):
+                        base64_str = base64.b64encode(jpeg_bytes).decode('utf-8')
+                        optimized['base64_data'] = JPEG_DATA_URI_PREFIX + base64_str
 
-                if drop_count > 0:
-                    print(f"   ⚠️  Optimized: {step['description']}, {len(optimized_images)} images: {final_mb:.2f}MB")
-                elif step['quality'] < 85 or step['resolution'] < initial_resolution:
-                    print(f"   ⚠️  Optimized: {step['description']}: {final_mb:.2f}MB")
-                else:
-                    print(f"   ✅ Payload: {final_mb:.2f}MB ({len(optimized_images)} images)")
+                    return optimized_images
 
-                return optimized_images
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
 
     # If we get here, nothing fit - return empty list (will gracefully degrade)
     print(f"   ❌ Cannot optimize images to fit {max_payload_mb}MB limit")
@@ -497,22 +642,22 @@ def validate_image_file(image_path: str, supported_formats: List[str] = None) ->
     Returns:
         True if valid, False otherwise
     """
-    if supported_formats is None:
-        supported_formats = ['png', 'jpg', 'jpeg', 'gif', 'webp']
-
-    path = Path(image_path)
-
-    # Check existence
-    if not path.exists():
+    # Check existence (a directory named like an image is not one)
+    if not os.path.isfile(image_path):
         return False
 
-    # Check format
-    ext = path.suffix.lower().lstrip('.')
-    if ext not in supported_formats:
+    # Check format (splitext avoids building a Path for every figure)
+    ext = os.path.splitext(image_path)[1].lower().lstrip('.')
+    if supported_formats is None:
+        formats, supported_formats = SUPPORTED_IMAGE_FORMATS, SUPPORTED_IMAGE_FORMATS_DISPLAY
+    else:
+        formats = supported_formats
+    if ext not in formats:
         print(f"WARNING: Unsupported image format: {ext} (supported: {supported_formats})")
         return False
 
-    # Try to open it with PIL if available, otherwise just check existence (already done above)
+    # Try to open it with PIL if available, otherwise just check existence (already done above).
+    # verify() parses the header and checks chunk structure without decoding pixels
     if HAS_PIL:
         try:
             with Image.open(image_path) as img:
@@ -12,6 +12,15 @@ import sys
 from pathlib import Path
 from html_to_markdown import convert_notebook_output_to_markdown
 
+from yaml_loader import SafeLoader
+
+FRONTMATTER_PATTERN = re.compile(r'^---\s*\n(.*?)\n---\s*\n', re.DOTALL)
+# Code fences, shortcodes and equations, matched leftmost-first so each span is consumed once.
+# Equations may not contain backticks, so stray dollar signs ("$5 ... $10") can't swallow a fence.
+# No capture groups: they disable the engine's first-character prefilter.
+NON_PROSE_PATTERN = re.compile(r'```.*?```|\{\{<.*?\}\}|\$\$[^`]*?\$\$|\$[^$`]+\$', re.DOTALL)
+EMBED_PATTERN = re.compile(r'\{\{<\s*embed\s+(.*?)\s*>\}\}')
+
 def parse_quarto(file_path: str) -> dict:
     """
     Parse a Quarto (.qmd) document, find all figures (manual and generated),
@@ -25,17 +34,17 @@ def parse_quarto(file_path: str) -> dict:
         print(f"ERROR: Report file not found: {file_path}", file=sys.stderr)
         sys.exit(1)
 
-    body = _get_body_content(content)
+    frontmatter, body = _split_frontmatter(content)
 
     figures_list = _extract_figures(body, Path(file_path).stem)
     structure = _extract_structure(body)
     notebook_outputs = _extract_notebook_outputs(body)
-    stats = _calculate_stats(body, len(figures_list))
+    stats = _calculate_stats(body, len(figures_list), structure)
     supplementary_status = _check_supplementary_files()
 
     return {
         'content': body,
-        'metadata': _get_yaml_metadata(content),
+        'metadata': _parse_frontmatter(frontmatter),
         'structure': structure,
         'figures': {
             'count': len(figures_list),
@@ -46,24 +55,32 @@ def parse_quarto(file_path: str) -> dict:
         'supplementary': supplementary_status
     }
 
-def _get_yaml_metadata(full_content: str) -> dict:
-    """Extracts YAML frontmatter from content."""
-    yaml_match = re.match(r'^---\s*\n(.*?)\n---\s*\n', full_content, re.DOTALL)
+def _split_frontmatter(full_content: str) -> tuple:
+    """Splits content into (YAML frontmatter text or None, body) with a single match."""
+    if full_content.startswith('\ufeff'):
+        full_content = full_content[1:]
+
+    yaml_match = FRONTMATTER_PATTERN.match(full_content)
     if yaml_match:
+        return yaml_match.group(1), full_content[yaml_match.end():]
+    return None, full_content
+
+def _parse_frontmatter(frontmatter: str) -> dict:
+    """Parses YAML frontmatter text (None when the document has none)."""
+    if frontmatter is not None:
         try:
-            return yaml.safe_load(yaml_match.group(1))
+            return yaml.load(frontmatter, Loader=SafeLoader)
         except yaml.YAMLError as e:
             print(f"WARNING: Failed to parse YAML frontmatter: {e}")
     return {}
 
+def _get_yaml_metadata(full_content: str) -> dict:
+    """Extracts YAML frontmatter from content."""
+    return _parse_frontmatter(_split_frontmatter(full_content)[0])
+
 def _get_body_content(full_content: str) -> str:
     """Extracts the body (non-YAML) content."""
-    if full_content.startswith('\ufeff'):
-        full_content = full_content[1:]
-    
-    yaml_match = re.match(r'^---\s*\n(.*?)\n---\s*\n', full_content, re.DOTALL)
-    body_start = yaml_match.end() if yaml_match else 0
-    return full_content[body_start:]
+    return _split_frontmatter(full_content)[1]
 
 def _extract_figures(body: str, report_stem: str) -> list:
     """
@@ -107,17 +124,25 @@ def _extract_figures(body: str, report_stem: str) -> list:
         i = path_end
 
     # 2. Find embed shortcodes and map generated images
-    embed_shortcodes = set(re.findall(r'\{\{<\s*embed\s+(.*?)\s*>\}\}', body))
+    # Unique shortcodes in document order (a set would make the
+    # first-match mapping below depend on string hash order)
+    embed_shortcodes = dict.fromkeys(
+        m.group(1) for m in EMBED_PATTERN.finditer(body)
+    )
+    # Notebook name per shortcode, computed once rather than per image
+    embed_notebooks = {
+        shortcode: Path(shortcode.partition('#')[0]).stem.lower()
+        for shortcode in embed_shortcodes
+    }
     generated_images = _find_quarto_generated_images(report_stem)
 
     for img_path, img_caption in generated_images.items():
         if any(f['path'] == img_path for f in figures): continue
 
         matched_to_embed = False
-        notebook_name_from_file = Path(img_path).name.split('-')[0].lower()
+        notebook_name_from_file = Path(img_path).name.partition('-')[0].lower()
         
-        for shortcode in embed_shortcodes:
-            notebook_name_from_code = Path(shortcode.split('#')[0]).stem.lower()
+        for shortcode, notebook_name_from_code in embed_notebooks.items():
             if notebook_name_from_file == notebook_name_from_code:
                 figures.append({
                     'path': img_path, 'caption': img_caption,
@@ -143,7 +168,7 @@ def _find_quarto_generated_images(report_stem: str) -> dict:
     # - {report_stem}_files/figure-*/ (if report was named something.qmd)
     # - index_files/figure-*/ (if report is index.qmd)
     # These can be at the root OR inside output/ directory
-    base_names = set([f"{report_stem}_files", "index_files"])  # Use set to avoid duplicates
+    base_names = dict.fromkeys([f"{report_stem}_files", "index_files"])  # Dedupe, keep order
     search_base_dirs = [Path("."), Path("output")]
 
     print("   Scanning for Quarto-generated images...")
@@ -160,26 +185,65 @@ def _find_quarto_generated_images(report_stem: str) -> dict:
     return images
 
 def _extract_structure(body: str) -> list:
-    headings = re.findall(r'^(#{1,6})\s+(.+)$', body, re.MULTILINE)
-    return [{'level': len(h[0]), 'text': h[1].strip()} for h in headings]
+    """
+    Collects ATX headings ('# Title' through '###### Title') line by line.
+    Lines inside ``` fences are skipped so code comments are not mistaken for headings.
+    """
+    headings = []
+    in_fence = False
+    for line in body.splitlines():
+        # Most lines are prose; one tuple startswith rejects them in a single C call
+        if not line.startswith(('#', '```')):
+            continue
+        if line.startswith('```'):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+
+        level = len(line) - len(line.lstrip('#'))
+        if level > 6 or level == len(line) or line[level] not in ' \t':
+            continue
+        text = line[level:].strip()
+        if text:
+            headings.append({'level': level, 'text': text})
+    return headings
 
-def _calculate_stats(body: str, figure_count: int) -> dict:
-    text_only = re.sub(r'```.*?```|\{\{<.*?\}\}', '', body, flags=re.DOTALL)
-    text_only = re.sub(r'\$\$.*?\$\$|\$[^$]+\$', '', text_only, flags=re.DOTALL)
-    words = len(re.findall(r'\w+', text_only))
+def _calculate_stats(body: str, figure_count: int, structure: list = None) -> dict:
+    """
+    Counts words, code blocks and equations in one left-to-right pass.
+    Words are only counted in the prose between code, shortcodes and equations.
+    Pass the headings from _extract_structure to avoid scanning them again.
+    """
+    if structure is None:
+        structure = _extract_structure(body)
+
+    prose_parts = []
+    code_blocks = equations = 0
+    prose_start = 0
+    for match in NON_PROSE_PATTERN.finditer(body):
+        prose_parts.append(body[prose_start:match.start()])
+        prose_start = match.end()
+        span = match.group()
+        if span[0] == '$':
+            equations += 1
+        else:
+            code_blocks += span.startswith('```{python}')
+    prose_parts.append(body[prose_start:])
 
     return {
-        'word_count': words,
-        'code_blocks': len(re.findall(r'```\{python\}.*?```', body, re.DOTALL)),
-        'equations': len(re.findall(r'\$\$.*?\$\$|\$[^$]+\$', body, re.DOTALL)),
+        # Whitespace-separated words, as section_extractor counts them
+        'word_count': len(' '.join(prose_parts).split()),
+        'code_blocks': code_blocks,
+        'equations': equations,
         'figures': figure_count,
-        'sections': len(_extract_structure(body))
+        'sections': len(structure)
     }
 
 def _check_supplementary_files() -> dict:
     try:
         with open('.github/config.yml', 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
     except Exception:
         return {}
 
@@ -199,7 +263,7 @@ def _extract_notebook_outputs(body: str) -> list:
     Find all {{< embed ... >}} shortcodes and extract their cell outputs.
     Returns a list of dicts with embed info and extracted outputs.
     """
-    embeds = re.findall(r'\{\{<\s*embed\s+(.*?)\s*>\}\}', body)
+    embeds = EMBED_PATTERN.findall(body)
     notebook_outputs = []
 
     print("   Extracting notebook cell outputs...")
@@ -359,7 +423,7 @@ def _extract_cell_outputs_from_notebook(notebook_path: str, cell_id: str = None)
 def main():
     try:
         with open('.github/config.yml', 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
     except FileNotFoundError:
         print("ERROR: .github/config.yml not found. Using default 'index.qmd'.", file=sys.stderr)
         config = {}
@@ -19,6 +19,8 @@ import sys
 from pathlib import Path
 from typing import Dict, List, Any
 
+from yaml_loader import SafeLoader
+
 
 def yaml_to_markdown(yaml_file: str, md_file: str) -> None:
     """
@@ -29,7 +31,7 @@ def yaml_to_markdown(yaml_file: str, md_file: str) -> None:
         md_file: Path to output Markdown file
     """
     with open(yaml_file, 'r') as f:
-        rubric = yaml.safe_load(f)
+        rubric = yaml.load(f, Loader=SafeLoader)
 
     # Build markdown content
     md = []
@@ -133,10 +135,13 @@ def parse_wide_table_rubric(content: str) -> Dict[str, Any]:
         'criteria': []
     }
 
-    # Extract title for assignment info
-    title_match = re.search(r'^## (.+?)(?:\n|$)', content, re.MULTILINE)
-    if title_match:
-        title = title_match.group(1).strip()
+    # Extract title for assignment info (first non-empty "## " heading)
+    title = next(
+        (line[3:] for line in content.split('\n') if line.startswith('## ') and line[3:]),
+        None,
+    )
+    if title is not None:
+        title = title.strip()
         # Try to extract course and assignment from title
         if ' - ' in title:
             course, name = title.split(' - ', 1)
@@ -316,11 +321,9 @@ def markdown_to_yaml(md_file: str, yaml_file: str) -> None:
             }
 
             # Extract description (text before "### Performance Levels")
-            desc_match = re.search(r'^(.*?)(?=###|$)', criterion_content, re.DOTALL)
-            if desc_match:
-                description = desc_match.group(1).strip()
-                if description:
-                    criterion['description'] = description
+            description = criterion_content.partition('###')[0].strip()
+            if description:
+                criterion['description'] = description
 
             # Extract performance levels table
             # Supports multiple formats:
@@ -393,7 +396,7 @@ def validate_roundtrip(yaml_file: str) -> bool:
 
     # Read original
     with open(yaml_file, 'r') as f:
-        original = yaml.safe_load(f)
+        original = yaml.load(f, Loader=SafeLoader)
 
     # Create temp files
     with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as md_temp:
@@ -409,7 +412,7 @@ def validate_roundtrip(yaml_file: str) -> bool:
 
         # Read converted
         with open(yaml_temp_path, 'r') as f:
-            converted = yaml.safe_load(f)
+            converted = yaml.load(f, Loader=SafeLoader)
 
         # Compare key fields
         errors = []
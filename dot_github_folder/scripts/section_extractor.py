@@ -20,6 +20,13 @@ from image_utils import filter_images_by_token_budget, validate_image_file
 
 API_BASE = "https://models.inference.ai.azure.com"
 
+# Matches ::: {.callout-*} ... ::: blocks across multiple lines
+CALLOUT_PATTERN = re.compile(r'::: \{\.callout-[^}]*\}[\s\S]*?^:::', re.MULTILINE)
+
+# Embed shortcodes: {{< embed notebook.ipynb#label >}}
+EMBED_PATTERN = re.compile(r'\{\{<\s*embed\s+(.*?)\s*>\}\}')
+EMBED_REF_PATTERN = re.compile(r'\{\{<\s*embed\s+([^\s]+)\s*>\}\}')
+
 def strip_callout_boxes(text: str) -> Tuple[str, bool]:
     """
     Remove Quarto callout boxes from text.
@@ -36,13 +43,13 @@ def strip_callout_boxes(text: str) -> Tuple[str, bool]:
         - cleaned_text: Text with callout boxes removed
         - found_callouts: True if any callout boxes were found and removed
     """
-    # Pattern matches ::: {.callout-*} ... ::: blocks across multiple lines
-    pattern = r'::: \{\.callout-[^}]*\}[\s\S]*?^:::'
-    matches = re.findall(pattern, text, flags=re.MULTILINE)
-    found_callouts = len(matches) > 0
+    # Most reports have no callouts left; skip the regex passes entirely
+    if '::: {.callout-' not in text:
+        return text.strip(), False
 
-    cleaned = re.sub(pattern, '', text, flags=re.MULTILINE)
-    return cleaned.strip(), found_callouts
+    # A single substitution pass both removes the callouts and counts them
+    cleaned, count = CALLOUT_PATTERN.subn('', text)
+    return cleaned.strip(), count > 0
 
 def extract_sections_for_criterion_ai(
     report: Dict[str, Any],
@@ -155,7 +162,7 @@ def criterion_has_images(
         return False
 
     # Strategy 1: Check for embed shortcodes in extracted text
-    embeds_in_text = set(re.findall(r'\{\{<\s*embed\s+(.*?)\s*>\}\}', extracted_text))
+    embeds_in_text = set(EMBED_PATTERN.findall(extracted_text))
     for fig in all_figures:
         if fig['source'] in embeds_in_text:
             if validate_image_file(fig['path']):
@@ -193,9 +200,12 @@ def augment_with_notebook_outputs(report: Dict[str, Any], extracted_text: str) -
     - {{< embed P01-Euler.ipynb#raw_data_table >}} → actual table content
     - {{< embed P01-Euler.ipynb#plot >}} → "(Figure: Comparison plot)"
     """
+    # Cheap literal check before running the embed regex
+    if '{{<' not in extracted_text:
+        return extracted_text
+
     # Find all embed shortcodes in the extracted text
-    embed_pattern = r'\{\{<\s*embed\s+([^\s]+)\s*>\}\}'
-    embeds_found = re.findall(embed_pattern, extracted_text)
+    embeds_found = set(EMBED_REF_PATTERN.findall(extracted_text))
 
     if not embeds_found:
         return extracted_text
@@ -214,39 +224,30 @@ def augment_with_notebook_outputs(report: Dict[str, Any], extracted_text: str) -
             outputs = nb_output.get('outputs', {})
             cell_id = nb_output.get('cell_id', 'unknown')
 
-            # Try to build content from text outputs
-            output_text = ""
+            # Collect output fragments and join once at the end
+            parts = []
 
             # Add HTML tables (converted to markdown)
-            if 'html_as_markdown' in outputs and outputs['html_as_markdown']:
-                output_text += f"\n**[Embedded Output from {cell_id}]**\n\n"
-                for table in outputs['html_as_markdown']:
-                    output_text += f"{table}\n\n"
+            for table in outputs.get('html_as_markdown') or []:
+                parts.append(f"{table}\n\n")
 
             # Add markdown outputs
-            if 'markdown' in outputs and outputs['markdown']:
-                if not output_text:
-                    output_text = f"\n**[Embedded Output from {cell_id}]**\n\n"
-                for md in outputs['markdown']:
-                    output_text += f"{md}\n\n"
+            for md in outputs.get('markdown') or []:
+                parts.append(f"{md}\n\n")
 
             # Add text outputs
-            if 'text' in outputs and outputs['text']:
-                if not output_text:
-                    output_text = f"\n**[Embedded Output from {cell_id}]**\n\n"
-                for text in outputs['text']:
-                    output_text += f"```\n{text}\n```\n\n"
+            for text in outputs.get('text') or []:
+                parts.append(f"```\n{text}\n```\n\n")
 
             # Add LaTeX outputs
-            if 'latex' in outputs and outputs['latex']:
-                if not output_text:
-                    output_text = f"\n**[Embedded Output from {cell_id}]**\n\n"
-                for latex in outputs['latex']:
-                    output_text += f"{latex}\n\n"
-
-            # If NO text content found but this is an embedded cell,
-            # use a descriptor (the actual figure will be passed via vision)
-            if not output_text:
+            for latex in outputs.get('latex') or []:
+                parts.append(f"{latex}\n\n")
+
+            if parts:
+                output_text = f"\n**[Embedded Output from {cell_id}]**\n\n" + ''.join(parts)
+            else:
+                # If NO text content found but this is an embedded cell,
+                # use a descriptor (the actual figure will be passed via vision)
                 # Clean up cell_id for better readability
                 cell_label = cell_id.replace('_', ' ').title()
                 output_text = f"\n**[Figure: {cell_label}]**\n"
@@ -256,11 +257,11 @@ def augment_with_notebook_outputs(report: Dict[str, Any], extracted_text: str) -
 
     # Replace all embed shortcodes with their actual content or descriptors
     if embed_replacements:
-        augmented_text = extracted_text
-        for embed_ref, content in embed_replacements.items():
-            # Build the exact shortcode pattern to replace
-            shortcode_pattern = r'\{\{<\s*embed\s+' + re.escape(embed_ref) + r'\s*>\}\}'
-            augmented_text = re.sub(shortcode_pattern, content, augmented_text)
+        # One pass over the text; shortcodes without a replacement are kept as-is
+        augmented_text = EMBED_REF_PATTERN.sub(
+            lambda m: embed_replacements.get(m.group(1), m.group(0)),
+            extracted_text,
+        )
 
         print(f"   Replaced {len(embed_replacements)} embed shortcode(s)")
         return augmented_text
@@ -286,7 +287,7 @@ def extract_relevant_images(
     relevant_images = {}
 
     # Strategy 1: Find images from embed shortcodes within the extracted text
-    embeds_in_text = set(re.findall(r'\{\{<\s*embed\s+(.*?)\s*>\}\}', extracted_text))
+    embeds_in_text = set(EMBED_PATTERN.findall(extracted_text))
     for fig in all_figures:
         if fig['source'] in embeds_in_text:
             if validate_image_file(fig['path']):
@@ -100,6 +100,7 @@ SCRIPT_FILES=(
     "update_feedback_system.sh"
     "validate_config.py"
     "validation_schemas.py"
+    "yaml_loader.py"
 )
 
 # Documentation to update
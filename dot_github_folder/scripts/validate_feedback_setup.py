@@ -24,6 +24,7 @@ from typing import List, Dict, Tuple
 
 # Add scripts to path
 sys.path.insert(0, str(Path(__file__).parent))
+from yaml_loader import SafeLoader
 from rubric_converter import markdown_to_yaml
 from parse_report import parse_quarto
 
@@ -56,7 +57,7 @@ def validate_config() -> Tuple[bool, Dict]:
 
     try:
         with open(config_path) as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
 
         issues = []
         required_fields = ['report_file', 'report_format', 'model']
@@ -146,7 +147,7 @@ def validate_rubric() -> Tuple[bool, Dict]:
 
     try:
         with open(rubric_path) as f:
-            rubric = yaml.safe_load(f)
+            rubric = yaml.load(f, Loader=SafeLoader)
 
         criteria = rubric.get('criteria', [])
         if not criteria:
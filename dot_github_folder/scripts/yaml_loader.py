@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Shared YAML loader selection for the feedback scripts.
+
+Uses PyYAML's libyaml-backed CSafeLoader when available, falling back to the
+pure-Python SafeLoader otherwise. Both only build plain Python objects, so
+results are identical; the C loader is just faster. Wheels from PyPI include
+libyaml; if yours does not, install libyaml (e.g. libyaml-dev) and reinstall
+PyYAML to get the faster parser.
+
+Usage:
+    from yaml_loader import SafeLoader
+    data = yaml.load(f, Loader=SafeLoader)
+"""
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+__all__ = ["SafeLoader"]
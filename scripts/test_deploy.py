@@ -20,9 +20,17 @@ import sys
 import os
 import yaml
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Tuple, List, Dict
 
+# Same fallback as dot_github_folder/scripts/yaml_loader.py, inlined so this
+# script runs without that directory on the path
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 
 class Colors:
     """Terminal color codes"""
@@ -56,7 +64,7 @@ def validate_config(config_path: Path) -> Tuple[bool, Dict, List[str]]:
 
     try:
         with open(config_path) as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
 
         if not isinstance(config, dict):
             return False, {}, ["config.yml does not contain a valid YAML dictionary"]
@@ -91,7 +99,7 @@ def validate_rubric(rubric_path: Path) -> Tuple[bool, Dict, List[str]]:
 
     try:
         with open(rubric_path) as f:
-            rubric = yaml.safe_load(f)
+            rubric = yaml.load(f, Loader=SafeLoader)
 
         if not isinstance(rubric, dict):
             return False, {}, ["rubric.yml does not contain a valid YAML dictionary"]
@@ -226,24 +234,36 @@ def main():
     temp_rubric_path = None
 
     try:
-        # 1. Check required files
-        print(f"{Colors.BOLD}1. Required Files{Colors.RESET}")
         required_files = [
             (repo_path / '.github' / 'config.yml', 'Configuration file'),
             (repo_path / '.github' / 'feedback' / 'RUBRIC.md', 'Rubric (markdown)'),
             (repo_path / '.github' / 'feedback' / 'guidance.md', 'Guidance file'),
         ]
+        md_path = repo_path / '.github' / 'feedback' / 'RUBRIC.md'
+        config_path = repo_path / '.github' / 'config.yml'
+
+        # The file checks and config parse are independent, silent I/O-bound
+        # steps, so they run on worker threads while the main thread converts
+        # the rubric below. The converter prints its own progress, so it stays
+        # on the main thread where its output lands in order.
+        executor = ThreadPoolExecutor(max_workers=2)
+        file_futures = [
+            executor.submit(check_file_exists, filepath, desc)
+            for filepath, desc in required_files
+        ]
+        config_future = executor.submit(validate_config, config_path)
+        executor.shutdown(wait=False)
 
-        for filepath, desc in required_files:
-            exists, msg = check_file_exists(filepath, desc)
+        # 1. Check required files
+        print(f"{Colors.BOLD}1. Required Files{Colors.RESET}")
+        for future in file_futures:
+            exists, msg = future.result()
             print(f"   {msg}")
             if not exists:
                 all_passed = False
 
         # 2. Convert RUBRIC.md to temp rubric.yml
         print(f"\n{Colors.BOLD}2. Rubric Conversion{Colors.RESET}")
-        md_path = repo_path / '.github' / 'feedback' / 'RUBRIC.md'
-
         if md_path.exists():
             success, temp_path, error_msg = convert_rubric_markdown_to_temp(md_path)
             if success:
@@ -258,8 +278,7 @@ def main():
 
         # 3. Validate config.yml
         print(f"\n{Colors.BOLD}3. Configuration Validation{Colors.RESET}")
-        config_path = repo_path / '.github' / 'config.yml'
-        config_ok, config, config_issues = validate_config(config_path)
+        config_ok, config, config_issues = config_future.result()
 
         if config_ok:
             print(f"   ✓ config.yml is valid")
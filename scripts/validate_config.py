@@ -15,121 +15,335 @@ Exit codes:
     1: YAML syntax errors
     2: Schema validation errors
     3: Logic errors (warnings promoted to errors with --strict)
+
+YAML loader selection is documented in dot_github_folder/scripts/yaml_loader.py.
 """
 
 import argparse
+import hashlib
+import io
+import json
+import os
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import List, Tuple
-
-import yaml
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 from validation_schemas import ConfigSchema, GuidanceSchema, RubricSchema, ValidationError
 
 
-def load_yaml_file(file_path: Path) -> Tuple[dict, List[ValidationError]]:
+# Results cache shared by repeated runs (pre-commit hooks, CI matrices). It lives in
+# the user's own cache directory: cached results are trusted, so a world-writable
+# location like /tmp would let other users plant "no errors" entries.
+CACHE_PATH = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "ai-feedback-system"
+    / "validate_config-cache.json"
+)
+
+
+class ValidationCache:
+    """
+    On-disk cache of per-file validation results.
+
+    Entries are keyed by path and matched first on the file's mtime and size,
+    then on a hash of its contents, so a fresh checkout of an unchanged file
+    (new mtime, same bytes) still hits. Entries are dropped whenever the
+    validation code (this script and validation_schemas.py), the PyYAML version
+    or the YAML loader in use changes. They are stored as JSON rather than
+    pickle so a damaged file can only cause a miss.
+    """
+
+    def __init__(self, path: Path = CACHE_PATH, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self._entries: Optional[dict] = None
+        self._code_digest: Optional[str] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(data: bytes) -> str:
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def _code_stamp(self) -> str:
+        """Hash of the validation code and YAML parser, so changes to either invalidate entries."""
+        if self._code_digest is None:
+            import yaml
+
+            script = Path(__file__)
+            hasher = hashlib.blake2b(digest_size=16)
+            # A PyYAML upgrade or a switch between the C and pure-Python loaders
+            # can change what parses, so they are part of the stamp too
+            hasher.update(f"{yaml.__version__}:{_safe_loader().__name__}\n".encode())
+            for code_file in (script, script.with_name("validation_schemas.py")):
+                try:
+                    hasher.update(code_file.read_bytes())
+                except OSError:
+                    pass
+            self._code_digest = hasher.hexdigest()
+        return self._code_digest
+
+    def _load(self) -> dict:
+        if self._entries is None:
+            try:
+                entries = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                entries = {}
+            self._entries = entries if isinstance(entries, dict) else {}
+        return self._entries
+
+    def _store(self, key: str, entry: dict) -> None:
+        with self._lock:
+            # One entry per path, so the cache never grows past the files validated
+            self._load()[key] = entry
+            self._dirty = True
+
+    def lookup_or_validate(
+        self,
+        file_path: Path,
+        validate: Callable[..., List[ValidationError]],
+        dir_entry: Optional[os.DirEntry] = None,
+    ) -> List[ValidationError]:
+        """
+        Return cached errors for file_path, or run validate and store them.
+
+        validate is called with the file's bytes when they have been read for
+        the content hash, so the stored errors describe exactly the hashed
+        contents; otherwise it is called with no arguments and reads the file
+        itself. dir_entry, if given, is the os.scandir() entry for file_path
+        and is used for its stat instead of statting the path again.
+        """
+        if not self.enabled:
+            return validate()
+
+        try:
+            st = dir_entry.stat() if dir_entry is not None else file_path.stat()
+        except OSError:
+            # Missing/unreadable files are cheap to report; don't cache them
+            return validate()
+
+        key = str(file_path.resolve())
+        stat_stamp = [st.st_mtime_ns, st.st_size]
+        code_stamp = self._code_stamp()
+
+        with self._lock:
+            entry = self._load().get(key)
+        if not isinstance(entry, dict) or entry.get("code") != code_stamp:
+            entry = None
+
+        try:
+            if entry is not None and entry.get("stat") == stat_stamp:
+                return [ValidationError(*fields) for fields in entry["errors"]]
+        except (KeyError, TypeError):
+            entry = None  # Malformed entry; revalidate and overwrite it
+
+        # Stat changed (or no entry); the contents may still match
+        try:
+            data = file_path.read_bytes()
+        except OSError:
+            return validate()
+        digest = self._digest(data)
+
+        try:
+            if entry is not None and entry.get("digest") == digest:
+                errors = [ValidationError(*fields) for fields in entry["errors"]]
+                self._store(key, dict(entry, stat=stat_stamp))
+                return errors
+        except (KeyError, TypeError):
+            pass  # Malformed entry; revalidate and overwrite it
+
+        # Validate the bytes just hashed, so the entry can't pair this digest
+        # with errors from a version of the file written in between
+        errors = validate(data)
+        self._store(key, {
+            "stat": stat_stamp,
+            "digest": digest,
+            "code": code_stamp,
+            "errors": [[e.severity, e.file, e.message, e.line, e.code] for e in errors],
+        })
+        return errors
+
+    def save(self) -> None:
+        """Write the cache back to disk if anything changed (best effort)."""
+        if not self._dirty:
+            return
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(self._entries))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+        self._dirty = False
+
+
+# Errors that mean a file could not be parsed at all (exit code 1)
+_SYNTAX_CODES = frozenset({ValidationError.YAML_SYNTAX, ValidationError.FILE_NOT_FOUND})
+
+# Report layout
+_SEP = "=" * 60
+_BANNER = f"\n{_SEP}\nVALIDATION RESULTS\n{_SEP}\n\n"
+_EXPECTED_STRUCTURE = (
+    "\nExpected structure:\n"
+    "  {config_dir}/\n"
+    "  ├── config.yml\n"
+    "  ├── rubric.yml\n"
+    "  └── guidance.md\n"
+)
+
+# Shared empty result for the common no-error path
+_NO_ERRORS: Tuple[ValidationError, ...] = ()
+
+
+def _safe_loader():
+    """Return the fastest available safe YAML loader class."""
+    # Same fallback as yaml_loader.py, inlined so this script also runs on its own
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+    return SafeLoader
+
+
+def load_yaml_file(
+    file_path: Path, data: Optional[bytes] = None
+) -> Tuple[dict, Tuple[ValidationError, ...]]:
     """
     Load and parse a YAML file.
 
+    Args:
+        file_path: Path to the YAML file
+        data: The file's contents, if already read; otherwise the file is read
+
     Returns:
-        Tuple of (parsed_dict, errors_list)
+        Tuple of (parsed_dict, errors_tuple)
     """
-    errors = []
+    # Imported here so --help and the missing-directory path don't pay for PyYAML
+    import yaml
 
     try:
-        with open(file_path, "r") as f:
-            content = yaml.safe_load(f)
-            if content is None:
-                errors.append(
-                    ValidationError(
-                        ValidationError.ERROR,
-                        file_path.name,
-                        "File is empty or contains only comments",
-                    )
-                )
-                return {}, errors
-            return content, errors
+        # Config files are tiny; read in one shot and let the loader parse bytes
+        if data is None:
+            data = file_path.read_bytes()
+        content = yaml.load(data, Loader=_safe_loader()) if data.strip() else None
+        if content is None:
+            return {}, (ValidationError.empty_file(file_path.name),)
+        return content, _NO_ERRORS
     except FileNotFoundError:
-        errors.append(
-            ValidationError(
-                ValidationError.ERROR,
+        return {}, (
+            ValidationError.error(
                 file_path.name,
                 f"File not found: {file_path}",
-            )
+                code=ValidationError.FILE_NOT_FOUND,
+            ),
         )
-        return {}, errors
     except yaml.YAMLError as e:
         error_msg = str(e)
         # Try to extract line number from YAML error
         if hasattr(e, "problem_mark"):
             mark = e.problem_mark
-            errors.append(
-                ValidationError(
-                    ValidationError.ERROR,
+            return {}, (
+                ValidationError.error(
                     file_path.name,
                     f"YAML syntax error at line {mark.line + 1}, column {mark.column + 1}: {e.problem}",
                     line=mark.line + 1,
-                )
-            )
-        else:
-            errors.append(
-                ValidationError(
-                    ValidationError.ERROR,
-                    file_path.name,
-                    f"YAML syntax error: {error_msg}",
-                )
+                    code=ValidationError.YAML_SYNTAX,
+                ),
             )
-        return {}, errors
+        return {}, (
+            ValidationError.error(
+                file_path.name,
+                f"YAML syntax error: {error_msg}",
+                code=ValidationError.YAML_SYNTAX,
+            ),
+        )
     except Exception as e:
-        errors.append(
-            ValidationError(
-                ValidationError.ERROR,
+        return {}, (
+            ValidationError.error(
                 file_path.name,
                 f"Unexpected error reading file: {e}",
-            )
+            ),
         )
-        return {}, errors
 
 
-def validate_config_file(config_dir: Path) -> List[ValidationError]:
-    """Validate config.yml file."""
+def validate_config_file(config_dir: Path, data: Optional[bytes] = None) -> List[ValidationError]:
+    """Validate config.yml file (from data, if its contents were already read)."""
     config_path = config_dir / "config.yml"
-    config, errors = load_yaml_file(config_path)
+    config, errors = load_yaml_file(config_path, data)
 
-    if not errors:
-        # Only validate schema if YAML parsing succeeded
-        schema_errors = ConfigSchema.validate(config)
-        errors.extend(schema_errors)
+    if errors:
+        return list(errors)
 
-    return errors
+    # Only validate schema if YAML parsing succeeded
+    return ConfigSchema.validate(config)
 
 
-def validate_rubric_file(config_dir: Path) -> List[ValidationError]:
-    """Validate rubric.yml file."""
+def validate_rubric_file(config_dir: Path, data: Optional[bytes] = None) -> List[ValidationError]:
+    """Validate rubric.yml file (from data, if its contents were already read)."""
     rubric_path = config_dir / "rubric.yml"
-    rubric, errors = load_yaml_file(rubric_path)
+    rubric, errors = load_yaml_file(rubric_path, data)
 
-    if not errors:
-        # Only validate schema if YAML parsing succeeded
-        schema_errors = RubricSchema.validate(rubric)
-        errors.extend(schema_errors)
+    if errors:
+        return list(errors)
 
-    return errors
+    # Only validate schema if YAML parsing succeeded
+    return RubricSchema.validate(rubric)
 
 
-def validate_guidance_file(config_dir: Path) -> List[ValidationError]:
-    """Validate guidance.md file."""
+def validate_guidance_file(config_dir: Path, data: Optional[bytes] = None) -> List[ValidationError]:
+    """Validate guidance.md file (from data, if its contents were already read)."""
+    if data is not None:
+        return GuidanceSchema.validate_bytes(data)
     guidance_path = config_dir / "guidance.md"
     return GuidanceSchema.validate(str(guidance_path))
 
 
-def print_summary(all_errors: dict, strict: bool = False) -> int:
+# Per-file validators, in report order
+VALIDATORS = {
+    "config.yml": validate_config_file,
+    "rubric.yml": validate_rubric_file,
+    "guidance.md": validate_guidance_file,
+}
+
+
+def validate_directory(config_dir: Path) -> Dict[str, List[ValidationError]]:
+    """Validate every file in one config directory (no caching)."""
+    return {file_name: validator(config_dir) for file_name, validator in VALIDATORS.items()}
+
+
+def validate_many(
+    config_dirs: Iterable[Path], max_workers: Optional[int] = None
+) -> Dict[Path, Dict[str, List[ValidationError]]]:
+    """
+    Validate many config directories in parallel, e.g. one per student repo.
+
+    Parsing and schema checks are pure Python, so directories are spread over
+    worker processes rather than threads.
+
+    Returns:
+        Dictionary mapping each config directory to its per-file errors
+    """
+    config_dirs = list(config_dirs)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(validate_directory, config_dirs, chunksize=8)
+        return dict(zip(config_dirs, results))
+
+
+def print_summary(
+    all_errors: dict, strict: bool = False, quiet: bool = False, as_json: bool = False
+) -> int:
     """
     Print validation summary and return appropriate exit code.
 
     Args:
-        all_errors: Dictionary mapping file names to lists of ValidationError
+        all_errors: Dictionary mapping file names to lists of ValidationError,
+            reported in insertion order
         strict: If True, treat warnings as errors
+        quiet: If True, print only per-file status and the summary
+        as_json: If True, print a JSON report instead of the text summary
 
     Returns:
         Exit code (0=success, 1=syntax errors, 2=schema errors, 3=logic errors/warnings)
@@ -139,65 +353,69 @@ def print_summary(all_errors: dict, strict: bool = False) -> int:
     has_syntax_errors = False
     has_schema_errors = False
 
-    print("\n" + "=" * 60)
-    print("VALIDATION RESULTS")
-    print("=" * 60 + "\n")
+    # Build the whole report and write it in one go rather than per line
+    buf = io.StringIO()
+    ERROR = ValidationError.ERROR
+    show_details = not (quiet or as_json)
+
+    buf.write(_BANNER)
 
     # Print results for each file
-    for file_name in sorted(all_errors.keys()):
-        errors = all_errors[file_name]
+    for file_name, errors in all_errors.items():
 
         if not errors:
-            print(f"✅ {file_name}: Valid")
+            print(f"✅ {file_name}: Valid", file=buf)
             continue
 
         # Count errors and warnings
-        file_errors = [e for e in errors if e.severity == ValidationError.ERROR]
-        file_warnings = [e for e in errors if e.severity == ValidationError.WARNING]
+        file_errors, file_warnings = [], []
+        for e in errors:
+            (file_errors if e.severity == ERROR else file_warnings).append(e)
 
         total_errors += len(file_errors)
         total_warnings += len(file_warnings)
 
         # Check for syntax errors (YAML parse failures)
-        if any("YAML syntax error" in e.message or "File not found" in e.message for e in file_errors):
+        if any(e.code in _SYNTAX_CODES for e in file_errors):
             has_syntax_errors = True
         elif file_errors:
             has_schema_errors = True
 
         # Print file status
         if file_errors:
-            print(f"❌ {file_name}: {len(file_errors)} error(s)")
+            print(f"❌ {file_name}: {len(file_errors)} error(s)", file=buf)
         elif file_warnings:
-            print(f"⚠️  {file_name}: {len(file_warnings)} warning(s)")
+            print(f"⚠️  {file_name}: {len(file_warnings)} warning(s)", file=buf)
 
         # Print each error/warning
-        for error in file_errors:
-            print(f"  ❌ {error}")
+        if show_details:
+            for error in file_errors:
+                print(f"  ❌ {error}", file=buf)
 
-        for warning in file_warnings:
-            if strict:
-                print(f"  ❌ {warning} [promoted to error in strict mode]")
-            else:
-                print(f"  ⚠️  {warning}")
+            for warning in file_warnings:
+                if strict:
+                    print(f"  ❌ {warning} [promoted to error in strict mode]", file=buf)
+                else:
+                    print(f"  ⚠️  {warning}", file=buf)
 
-        print()
+            print(file=buf)
 
     # Print summary
-    print("=" * 60)
+    print(_SEP, file=buf)
     if strict and total_warnings > 0:
-        print(f"Summary: {total_errors + total_warnings} error(s), 0 warning(s) [strict mode]")
+        print(f"Summary: {total_errors + total_warnings} error(s), 0 warning(s) [strict mode]", file=buf)
         exit_code = 2 if has_schema_errors or total_warnings else 1 if has_syntax_errors else 3
     else:
-        print(f"Summary: {total_errors} error(s), {total_warnings} warning(s)")
+        print(f"Summary: {total_errors} error(s), {total_warnings} warning(s)", file=buf)
 
         if total_errors == 0 and total_warnings == 0:
-            print("\n✅ All configuration files are valid!")
+            print("\n✅ All configuration files are valid!", file=buf)
             exit_code = 0
         elif total_errors == 0:
-            print("\n⚠️  Warnings found, but no errors")
+            print("\n⚠️  Warnings found, but no errors", file=buf)
             exit_code = 0  # Warnings don't cause failure by default
         else:
-            print("\n❌ Validation failed")
+            print("\n❌ Validation failed", file=buf)
             if has_syntax_errors:
                 exit_code = 1
             elif has_schema_errors:
@@ -205,16 +423,27 @@ def print_summary(all_errors: dict, strict: bool = False) -> int:
             else:
                 exit_code = 3
 
-    print("=" * 60 + "\n")
+    print(_SEP, end="\n\n", file=buf)
+
+    if as_json:
+        report = {
+            "exit_code": exit_code,
+            "strict": strict,
+            "errors": total_errors,
+            "warnings": total_warnings,
+            "files": {
+                file_name: [e.to_dict() for e in errors]
+                for file_name, errors in all_errors.items()
+            },
+        }
+        sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    else:
+        sys.stdout.write(buf.getvalue())
+    sys.stdout.flush()
     return exit_code
 
 
-def main():
-    """Main validation function."""
-    parser = argparse.ArgumentParser(
-        description="Validate AI feedback system configuration files",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+_EPILOG = """
 Exit codes:
   0: All valid (or only warnings in non-strict mode)
   1: YAML syntax errors
@@ -230,7 +459,23 @@ Examples:
 
   # Strict mode (treat warnings as errors)
   python validate_config.py --strict
-        """,
+
+  # Ignore cached results from earlier runs
+  python validate_config.py --no-cache
+
+  # Stop at the first file that fails to parse
+  python validate_config.py --fail-fast
+
+  # Machine-readable report for CI
+  python validate_config.py --json
+"""
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser."""
+    parser = argparse.ArgumentParser(
+        description="Validate AI feedback system configuration files",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=_EPILOG,
     )
 
     parser.add_argument(
@@ -246,41 +491,100 @@ Examples:
         help="Treat warnings as errors",
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Revalidate every file instead of reusing results for unchanged files",
+    )
+
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Stop after the first file with a YAML syntax error or missing file",
+    )
+
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="Only print per-file status and the summary, not each error",
+    )
 
-    # Check if config directory exists
-    if not args.config_dir.exists():
-        print(f"❌ Error: Configuration directory not found: {args.config_dir}")
-        print(f"\nExpected structure:")
-        print(f"  {args.config_dir}/")
-        print(f"  ├── config.yml")
-        print(f"  ├── rubric.yml")
-        print(f"  └── guidance.md")
-        return 1
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the results as JSON instead of a text report",
+    )
 
-    print(f"Validating configuration files in: {args.config_dir}")
-    print()
+    return parser
 
-    # Validate each file
-    all_errors = {}
 
-    print("Checking config.yml...", end=" ")
-    config_errors = validate_config_file(args.config_dir)
-    all_errors["config.yml"] = config_errors
-    print("done")
+def main():
+    """Main validation function."""
+    args = _build_parser().parse_args()
 
-    print("Checking rubric.yml...", end=" ")
-    rubric_errors = validate_rubric_file(args.config_dir)
-    all_errors["rubric.yml"] = rubric_errors
-    print("done")
+    # List the config directory once; this doubles as the existence check
+    try:
+        with os.scandir(args.config_dir) as it:
+            dir_entries = {dir_entry.name: dir_entry for dir_entry in it}
+    except (FileNotFoundError, NotADirectoryError):
+        error = ValidationError.error(
+            str(args.config_dir),
+            f"Configuration directory not found: {args.config_dir}",
+            code=ValidationError.FILE_NOT_FOUND,
+        )
+        exit_code = print_summary(
+            {str(args.config_dir): [error]}, strict=args.strict, quiet=args.quiet, as_json=args.json
+        )
+        if not args.json:
+            sys.stdout.write(_EXPECTED_STRUCTURE.format(config_dir=args.config_dir))
+        return exit_code
+    except OSError as e:
+        # The directory exists but can't be listed (e.g. permissions); report it
+        # like any other validation failure rather than with a traceback
+        error = ValidationError.error(
+            str(args.config_dir), f"Cannot read configuration directory: {e.strerror or e}"
+        )
+        return print_summary(
+            {str(args.config_dir): [error]}, strict=args.strict, quiet=args.quiet, as_json=args.json
+        )
+
+    buf = io.StringIO()
+    print(f"Validating configuration files in: {args.config_dir}", file=buf)
+    print(file=buf)
+
+    # Validate each file. The files are independent, so read and parse them
+    # concurrently and collect the results in a fixed order. With --fail-fast
+    # they run one at a time so the remaining files can be skipped.
+    all_errors = {}
+    cache = ValidationCache(enabled=not args.no_cache)
+
+    max_workers = 1 if args.fail_fast else len(VALIDATORS)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for file_name, validator in VALIDATORS.items():
+            validate = partial(validator, args.config_dir)
+            dir_entry = dir_entries.get(file_name)
+            if dir_entry is None:
+                # Missing files are reported by the validator; nothing to cache
+                futures[file_name] = executor.submit(validate)
+            else:
+                futures[file_name] = executor.submit(
+                    cache.lookup_or_validate, Path(dir_entry.path), validate, dir_entry
+                )
+        for file_name, future in futures.items():
+            all_errors[file_name] = future.result()
+            print(f"Checking {file_name}... done", file=buf)
+            if args.fail_fast and any(e.code in _SYNTAX_CODES for e in all_errors[file_name]):
+                executor.shutdown(cancel_futures=True)
+                break
 
-    print("Checking guidance.md...", end=" ")
-    guidance_errors = validate_guidance_file(args.config_dir)
-    all_errors["guidance.md"] = guidance_errors
-    print("done")
+    if not (args.quiet or args.json):
+        sys.stdout.write(buf.getvalue())
+    cache.save()
 
     # Print summary and exit
-    exit_code = print_summary(all_errors, strict=args.strict)
+    exit_code = print_summary(all_errors, strict=args.strict, quiet=args.quiet, as_json=args.json)
     return exit_code
 
 
@@ -3,11 +3,12 @@
 Schema definitions for validating AI feedback system configuration files.
 """
 
+from collections.abc import Hashable
 from typing import Any, Dict, List, Optional, Tuple
 
 
-# Known valid model names (as of December 2025)
-KNOWN_MODELS = [
+# Known valid model names (as of December 2025), in display order
+KNOWN_MODELS_DISPLAY = (
     "gpt-4o",
     "gpt-4o-mini",
     "gpt-5",
@@ -30,26 +31,72 @@ KNOWN_MODELS = [
     "grok-2",
     "grok-3",
     "grok-3-mini",
-]
+)
 
 # Known report formats
-KNOWN_FORMATS = ["quarto", "markdown", "jupyter", "latex", "html"]
+KNOWN_FORMATS_DISPLAY = ("quarto", "markdown", "jupyter", "latex", "html")
 
 # Known truncation strategies
-KNOWN_TRUNCATION_STRATEGIES = ["smart", "head", "tail"]
+KNOWN_TRUNCATION_STRATEGIES_DISPLAY = ("smart", "head", "tail")
+
+# Sets for membership checks; the tuples above are only for messages
+KNOWN_MODELS = frozenset(KNOWN_MODELS_DISPLAY)
+KNOWN_FORMATS = frozenset(KNOWN_FORMATS_DISPLAY)
+KNOWN_TRUNCATION_STRATEGIES = frozenset(KNOWN_TRUNCATION_STRATEGIES_DISPLAY)
+
+
+def _is_known(value: Any, known: frozenset) -> bool:
+    """Membership check that treats unhashable YAML values (lists, dicts) as unknown."""
+    try:
+        return value in known
+    except TypeError:
+        return False
 
 
 class ValidationError:
     """Represents a validation error with severity level."""
 
+    __slots__ = ("severity", "file", "message", "line", "code")
+
     ERROR = "error"
     WARNING = "warning"
 
-    def __init__(self, severity: str, file: str, message: str, line: Optional[int] = None):
+    # Error codes for failures that prevent a file from being parsed at all
+    YAML_SYNTAX = "yaml_syntax"
+    FILE_NOT_FOUND = "file_not_found"
+
+    def __init__(
+        self,
+        severity: str,
+        file: str,
+        message: str,
+        line: Optional[int] = None,
+        code: Optional[str] = None,
+    ):
         self.severity = severity
         self.file = file
         self.message = message
         self.line = line
+        self.code = code
+
+    @classmethod
+    def error(
+        cls, file: str, message: str, line: Optional[int] = None, code: Optional[str] = None
+    ) -> "ValidationError":
+        """Build an ERROR-severity ValidationError."""
+        return cls(cls.ERROR, file, message, line, code)
+
+    @classmethod
+    def warning(
+        cls, file: str, message: str, line: Optional[int] = None, code: Optional[str] = None
+    ) -> "ValidationError":
+        """Build a WARNING-severity ValidationError."""
+        return cls(cls.WARNING, file, message, line, code)
+
+    @classmethod
+    def empty_file(cls, file: str) -> "ValidationError":
+        """Error for a YAML file that is empty or contains only comments."""
+        return cls.error(file, "File is empty or contains only comments")
 
     def __str__(self):
         line_info = f"Line {self.line}: " if self.line else ""
@@ -58,6 +105,16 @@ class ValidationError:
     def __repr__(self):
         return f"ValidationError({self.severity}, {self.file}, {self.message}, {self.line})"
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the error as a JSON-serializable dictionary."""
+        return {
+            "severity": self.severity,
+            "file": self.file,
+            "message": self.message,
+            "line": self.line,
+            "code": self.code,
+        }
+
 
 class ConfigSchema:
     """Schema for config.yml validation."""
@@ -67,40 +124,64 @@ class ConfigSchema:
         "model.primary",
     ]
 
+    # Boolean feature flags (top level) and debug_mode flags
+    FEATURE_FLAGS = (
+        "enable_code_analysis",
+        "enable_figure_checking",
+        "enable_citation_checking",
+        "enable_section_checking",
+    )
+    DEBUG_FLAGS = (
+        "enabled",
+        "save_prompts",
+        "save_responses",
+        "save_context",
+        "save_api_metadata",
+        "prettify_json",
+        "upload_artifacts",
+    )
+
     @staticmethod
     def validate(config: Dict[str, Any]) -> List[ValidationError]:
         """Validate config.yml structure and values."""
         errors = []
+        if not isinstance(config, dict):
+            errors.append(
+                ValidationError.error(
+                    "config.yml",
+                    "config.yml must be a mapping of settings, not a list or single value",
+                )
+            )
+            return errors
+
+        report = config.get("report")
+        model = config.get("model")
 
         # Check required fields - support both old and new format
         # Old format: report_file
         # New format: report.filename
         has_report_file = "report_file" in config
-        has_report_nested = "report" in config and isinstance(config.get("report"), dict) and "filename" in config["report"]
+        has_report_nested = isinstance(report, dict) and "filename" in report
 
         if not has_report_file and not has_report_nested:
             errors.append(
-                ValidationError(
-                    ValidationError.ERROR,
+                ValidationError.error(
                     "config.yml",
                     "'report_file' or 'report.filename' is required but missing",
                 )
             )
 
-        if "model" not in config or not isinstance(config.get("model"), dict):
+        if not isinstance(model, dict):
             errors.append(
-                ValidationError(
-                    ValidationError.ERROR,
+                ValidationError.error(
                     "config.yml",
                     "'model' section is required and must be a dictionary",
                 )
             )
         else:
-            model = config["model"]
             if "primary" not in model:
                 errors.append(
-                    ValidationError(
-                        ValidationError.ERROR,
+                    ValidationError.error(
                         "config.yml",
                         "'model.primary' is required but missing",
                     )
@@ -108,90 +189,66 @@ class ConfigSchema:
             else:
                 # Validate model name
                 primary = model["primary"]
-                if primary not in KNOWN_MODELS:
+                if not _is_known(primary, KNOWN_MODELS):
                     errors.append(
-                        ValidationError(
-                            ValidationError.WARNING,
+                        ValidationError.warning(
                             "config.yml",
                             f"'model.primary' uses unknown model '{primary}'. "
-                            f"Known models: {', '.join(KNOWN_MODELS[:5])}... "
+                            f"Known models: {', '.join(KNOWN_MODELS_DISPLAY[:5])}... "
                             f"(This may be fine if GitHub Models added new models)",
                         )
                     )
 
             if "fallback" in model:
                 fallback = model["fallback"]
-                if fallback not in KNOWN_MODELS:
+                if not _is_known(fallback, KNOWN_MODELS):
                     errors.append(
-                        ValidationError(
-                            ValidationError.WARNING,
+                        ValidationError.warning(
                             "config.yml",
                             f"'model.fallback' uses unknown model '{fallback}'",
                         )
                     )
 
         # Validate token limits (optional but recommended)
-        if "max_input_tokens" in config:
-            max_input = config["max_input_tokens"]
-            if not isinstance(max_input, int) or max_input <= 0:
-                errors.append(
-                    ValidationError(
-                        ValidationError.ERROR,
-                        "config.yml",
-                        f"'max_input_tokens' must be a positive integer, got: {max_input}",
+        for key in ("max_input_tokens", "max_output_tokens"):
+            if key in config:
+                limit = config[key]
+                if not isinstance(limit, int) or limit <= 0:
+                    errors.append(
+                        ValidationError.error(
+                            "config.yml",
+                            f"'{key}' must be a positive integer, got: {limit}",
+                        )
                     )
-                )
-        else:
-            errors.append(
-                ValidationError(
-                    ValidationError.WARNING,
-                    "config.yml",
-                    "'max_input_tokens' is not set. Consider adding it for better control over token usage.",
-                )
-            )
-
-        if "max_output_tokens" in config:
-            max_output = config["max_output_tokens"]
-            if not isinstance(max_output, int) or max_output <= 0:
+            else:
                 errors.append(
-                    ValidationError(
-                        ValidationError.ERROR,
+                    ValidationError.warning(
                         "config.yml",
-                        f"'max_output_tokens' must be a positive integer, got: {max_output}",
+                        f"'{key}' is not set. Consider adding it for better control over token usage.",
                     )
                 )
-        else:
-            errors.append(
-                ValidationError(
-                    ValidationError.WARNING,
-                    "config.yml",
-                    "'max_output_tokens' is not set. Consider adding it for better control over token usage.",
-                )
-            )
 
         # Validate report format (if present)
         if "report_format" in config:
             report_format = config["report_format"]
-            if report_format not in KNOWN_FORMATS:
+            if not _is_known(report_format, KNOWN_FORMATS):
                 errors.append(
-                    ValidationError(
-                        ValidationError.WARNING,
+                    ValidationError.warning(
                         "config.yml",
                         f"'report_format' uses unknown format '{report_format}'. "
-                        f"Known formats: {', '.join(KNOWN_FORMATS)}",
+                        f"Known formats: {', '.join(KNOWN_FORMATS_DISPLAY)}",
                     )
                 )
 
         # Validate truncation strategy (if present)
         if "truncation_strategy" in config:
             strategy = config["truncation_strategy"]
-            if strategy not in KNOWN_TRUNCATION_STRATEGIES:
+            if not _is_known(strategy, KNOWN_TRUNCATION_STRATEGIES):
                 errors.append(
-                    ValidationError(
-                        ValidationError.WARNING,
+                    ValidationError.warning(
                         "config.yml",
                         f"'truncation_strategy' uses unknown strategy '{strategy}'. "
-                        f"Known strategies: {', '.join(KNOWN_TRUNCATION_STRATEGIES)}",
+                        f"Known strategies: {', '.join(KNOWN_TRUNCATION_STRATEGIES_DISPLAY)}",
                     )
                 )
 
@@ -200,8 +257,7 @@ class ConfigSchema:
             timeout = config["request_timeout"]
             if not isinstance(timeout, (int, float)) or timeout <= 0:
                 errors.append(
-                    ValidationError(
-                        ValidationError.ERROR,
+                    ValidationError.error(
                         "config.yml",
                         f"'request_timeout' must be a positive number, got: {timeout}",
                     )
@@ -211,25 +267,17 @@ class ConfigSchema:
             timeout = config["workflow_timeout"]
             if not isinstance(timeout, (int, float)) or timeout <= 0:
                 errors.append(
-                    ValidationError(
-                        ValidationError.ERROR,
+                    ValidationError.error(
                         "config.yml",
                         f"'workflow_timeout' must be a positive number, got: {timeout}",
                     )
                 )
 
         # Validate feature flags (if present)
-        feature_flags = [
-            "enable_code_analysis",
-            "enable_figure_checking",
-            "enable_citation_checking",
-            "enable_section_checking",
-        ]
-        for flag in feature_flags:
+        for flag in ConfigSchema.FEATURE_FLAGS:
             if flag in config and not isinstance(config[flag], bool):
                 errors.append(
-                    ValidationError(
-                        ValidationError.ERROR,
+                    ValidationError.error(
                         "config.yml",
                         f"'{flag}' must be a boolean (true/false), got: {config[flag]}",
                     )
@@ -240,27 +288,16 @@ class ConfigSchema:
             debug = config["debug_mode"]
             if not isinstance(debug, dict):
                 errors.append(
-                    ValidationError(
-                        ValidationError.ERROR,
+                    ValidationError.error(
                         "config.yml",
                         "'debug_mode' must be a dictionary",
                     )
                 )
             else:
-                debug_flags = [
-                    "enabled",
-                    "save_prompts",
-                    "save_responses",
-                    "save_context",
-                    "save_api_metadata",
-                    "prettify_json",
-                    "upload_artifacts",
-                ]
-                for flag in debug_flags:
+                for flag in ConfigSchema.DEBUG_FLAGS:
                     if flag in debug and not isinstance(debug[flag], bool):
                         errors.append(
-                            ValidationError(
-                                ValidationError.ERROR,
+                            ValidationError.error(
                                 "config.yml",
                                 f"'debug_mode.{flag}' must be a boolean, got: {debug[flag]}",
                             )
@@ -269,8 +306,7 @@ class ConfigSchema:
                 # Security warning if upload_artifacts is enabled
                 if debug.get("upload_artifacts", False):
                     errors.append(
-                        ValidationError(
-                            ValidationError.WARNING,
+                        ValidationError.warning(
                             "config.yml",
                             "'debug_mode.upload_artifacts' is enabled. Artifacts will contain student "
                             "report content and grading prompts. Only use in instructor-controlled repos.",
@@ -280,9 +316,30 @@ class ConfigSchema:
         return errors
 
 
+def _criterion_label(i: int, criterion: Dict[str, Any]) -> str:
+    """Message prefix for errors in the i-th (0-based) criterion."""
+    return f"Criterion {i+1} ({criterion.get('name', '?')})"
+
+
+def _check_point_range(point_range: Any) -> Optional[str]:
+    """Check a level's point_range is [min, max] with min <= max."""
+    if not isinstance(point_range, list) or len(point_range) != 2:
+        return "'point_range' must be a list of 2 numbers [min, max]"
+    min_points, max_points = point_range
+    if min_points > max_points:
+        return f"point_range min ({min_points}) > max ({max_points})"
+    return None
+
+
 class RubricSchema:
     """Schema for rubric.yml validation."""
 
+    CRITERION_REQUIRED_FIELDS = ("id", "name", "weight", "description")
+
+    # Checks for optional level fields: (key, check). A check returns a
+    # problem description, or None if the value is fine.
+    LEVEL_CHECKS = (("point_range", _check_point_range),)
+
     @staticmethod
     def validate(rubric: Dict[str, Any]) -> List[ValidationError]:
         """Validate rubric.yml structure and values."""
@@ -291,8 +348,7 @@ class RubricSchema:
         # Check assignment section
         if "assignment" not in rubric:
             errors.append(
-                ValidationError(
-                    ValidationError.ERROR,
+                ValidationError.error(
                     "rubric.yml",
                     "'assignment' section is required but missing",
                 )
@@ -301,8 +357,7 @@ class RubricSchema:
             assignment = rubric["assignment"]
             if not isinstance(assignment, dict):
                 errors.append(
-                    ValidationError(
-                        ValidationError.ERROR,
+                    ValidationError.error(
                         "rubric.yml",
                         "'assignment' must be a dictionary",
                     )
@@ -311,24 +366,21 @@ class RubricSchema:
                 # Required assignment fields
                 if "name" not in assignment:
                     errors.append(
-                        ValidationError(
-                            ValidationError.ERROR,
+                        ValidationError.error(
                             "rubric.yml",
                             "'assignment.name' is required but missing",
                         )
                     )
                 if "course" not in assignment:
                     errors.append(
-                        ValidationError(
-                            ValidationError.ERROR,
+                        ValidationError.error(
                             "rubric.yml",
                             "'assignment.course' is required but missing",
                         )
                     )
                 if "total_points" not in assignment:
                     errors.append(
-                        ValidationError(
-                            ValidationError.ERROR,
+                        ValidationError.error(
                             "rubric.yml",
                             "'assignment.total_points' is required but missing",
                         )
@@ -337,8 +389,7 @@ class RubricSchema:
                     total = assignment["total_points"]
                     if not isinstance(total, (int, float)) or total <= 0:
                         errors.append(
-                            ValidationError(
-                                ValidationError.ERROR,
+                            ValidationError.error(
                                 "rubric.yml",
                                 f"'assignment.total_points' must be a positive number, got: {total}",
                             )
@@ -347,8 +398,7 @@ class RubricSchema:
         # Check criteria
         if "criteria" not in rubric:
             errors.append(
-                ValidationError(
-                    ValidationError.ERROR,
+                ValidationError.error(
                     "rubric.yml",
                     "'criteria' list is required but missing",
                 )
@@ -357,16 +407,14 @@ class RubricSchema:
             criteria = rubric["criteria"]
             if not isinstance(criteria, list):
                 errors.append(
-                    ValidationError(
-                        ValidationError.ERROR,
+                    ValidationError.error(
                         "rubric.yml",
                         "'criteria' must be a list",
                     )
                 )
             elif len(criteria) == 0:
                 errors.append(
-                    ValidationError(
-                        ValidationError.ERROR,
+                    ValidationError.error(
                         "rubric.yml",
                         "'criteria' list is empty - at least one criterion is required",
                     )
@@ -374,13 +422,11 @@ class RubricSchema:
             else:
                 # Validate each criterion
                 total_weight = 0
-                seen_ids = set()
 
                 for i, criterion in enumerate(criteria):
                     if not isinstance(criterion, dict):
                         errors.append(
-                            ValidationError(
-                                ValidationError.ERROR,
+                            ValidationError.error(
                                 "rubric.yml",
                                 f"Criterion {i+1} must be a dictionary",
                             )
@@ -388,39 +434,23 @@ class RubricSchema:
                         continue
 
                     # Required fields
-                    required = ["id", "name", "weight", "description"]
-                    for field in required:
+                    for field in RubricSchema.CRITERION_REQUIRED_FIELDS:
                         if field not in criterion:
                             errors.append(
-                                ValidationError(
-                                    ValidationError.ERROR,
+                                ValidationError.error(
                                     "rubric.yml",
                                     f"Criterion {i+1}: '{field}' is required but missing",
                                 )
                             )
 
-                    # Validate ID uniqueness
-                    if "id" in criterion:
-                        criterion_id = criterion["id"]
-                        if criterion_id in seen_ids:
-                            errors.append(
-                                ValidationError(
-                                    ValidationError.ERROR,
-                                    "rubric.yml",
-                                    f"Criterion {i+1}: duplicate id '{criterion_id}'",
-                                )
-                            )
-                        seen_ids.add(criterion_id)
-
                     # Validate weight
                     if "weight" in criterion:
                         weight = criterion["weight"]
                         if not isinstance(weight, (int, float)) or weight <= 0:
                             errors.append(
-                                ValidationError(
-                                    ValidationError.ERROR,
+                                ValidationError.error(
                                     "rubric.yml",
-                                    f"Criterion {i+1} ({criterion.get('name', '?')}): "
+                                    f"{_criterion_label(i, criterion)}: "
                                     f"'weight' must be a positive number, got: {weight}",
                                 )
                             )
@@ -430,10 +460,9 @@ class RubricSchema:
                     # Validate levels
                     if "levels" not in criterion:
                         errors.append(
-                            ValidationError(
-                                ValidationError.WARNING,
+                            ValidationError.warning(
                                 "rubric.yml",
-                                f"Criterion {i+1} ({criterion.get('name', '?')}): "
+                                f"{_criterion_label(i, criterion)}: "
                                 f"'levels' section is missing (recommended)",
                             )
                         )
@@ -441,10 +470,9 @@ class RubricSchema:
                         levels = criterion["levels"]
                         if not isinstance(levels, dict):
                             errors.append(
-                                ValidationError(
-                                    ValidationError.ERROR,
+                                ValidationError.error(
                                     "rubric.yml",
-                                    f"Criterion {i+1} ({criterion.get('name', '?')}): "
+                                    f"{_criterion_label(i, criterion)}: "
                                     f"'levels' must be a dictionary",
                                 )
                             )
@@ -452,39 +480,38 @@ class RubricSchema:
                             # Validate each level
                             for level_name, level_info in levels.items():
                                 if not isinstance(level_info, dict):
+                                    problems = ["must be a dictionary"]
+                                else:
+                                    problems = []
+                                    for key, check in RubricSchema.LEVEL_CHECKS:
+                                        if key in level_info:
+                                            problem = check(level_info[key])
+                                            if problem:
+                                                problems.append(problem)
+                                for problem in problems:
                                     errors.append(
-                                        ValidationError(
-                                            ValidationError.ERROR,
+                                        ValidationError.error(
                                             "rubric.yml",
-                                            f"Criterion {i+1} ({criterion.get('name', '?')}), "
-                                            f"level '{level_name}': must be a dictionary",
+                                            f"{_criterion_label(i, criterion)}, "
+                                            f"level '{level_name}': {problem}",
                                         )
                                     )
-                                    continue
-
-                                # Check point_range
-                                if "point_range" in level_info:
-                                    point_range = level_info["point_range"]
-                                    if not isinstance(point_range, list) or len(point_range) != 2:
-                                        errors.append(
-                                            ValidationError(
-                                                ValidationError.ERROR,
-                                                "rubric.yml",
-                                                f"Criterion {i+1} ({criterion.get('name', '?')}), "
-                                                f"level '{level_name}': 'point_range' must be a list of 2 numbers [min, max]",
-                                            )
-                                        )
-                                    else:
-                                        min_points, max_points = point_range
-                                        if min_points > max_points:
-                                            errors.append(
-                                                ValidationError(
-                                                    ValidationError.ERROR,
-                                                    "rubric.yml",
-                                                    f"Criterion {i+1} ({criterion.get('name', '?')}), "
-                                                    f"level '{level_name}': point_range min ({min_points}) > max ({max_points})",
-                                                )
-                                            )
+
+                # Validate ID uniqueness - one error per repeated id
+                id_positions = {}
+                for i, criterion in enumerate(criteria):
+                    if isinstance(criterion, dict) and isinstance(criterion.get("id"), Hashable):
+                        id_positions.setdefault(criterion["id"], []).append(i + 1)
+
+                for criterion_id, positions in id_positions.items():
+                    if len(positions) > 1:
+                        errors.append(
+                            ValidationError.error(
+                                "rubric.yml",
+                                f"Duplicate id '{criterion_id}' used by criteria "
+                                f"{', '.join(map(str, positions))}",
+                            )
+                        )
 
                 # Check total weight
                 expected_weight = 100
@@ -494,8 +521,7 @@ class RubricSchema:
 
                 if abs(total_weight - expected_weight) > 0.01:  # Allow for floating point
                     errors.append(
-                        ValidationError(
-                            ValidationError.WARNING,
+                        ValidationError.warning(
                             "rubric.yml",
                             f"Criterion weights sum to {total_weight}, expected {expected_weight}. "
                             f"This may be intentional, but typically weights should sum to 100%.",
@@ -511,43 +537,59 @@ class GuidanceSchema:
     @staticmethod
     def validate(guidance_path: str) -> List[ValidationError]:
         """Validate guidance.md exists and is not empty."""
-        errors = []
-
         try:
-            with open(guidance_path, "r") as f:
-                content = f.read().strip()
-                if not content:
-                    errors.append(
-                        ValidationError(
-                            ValidationError.ERROR,
-                            "guidance.md",
-                            "File is empty - guidance content is required",
-                        )
-                    )
-                elif len(content) < 100:
-                    errors.append(
-                        ValidationError(
-                            ValidationError.WARNING,
-                            "guidance.md",
-                            f"File is very short ({len(content)} characters). "
-                            f"Consider providing more detailed guidance for the AI.",
-                        )
-                    )
+            with open(guidance_path, "rb") as f:
+                data = f.read()
         except FileNotFoundError:
-            errors.append(
-                ValidationError(
-                    ValidationError.ERROR,
+            return [
+                ValidationError.error(
                     "guidance.md",
                     "File not found - guidance.md is required",
+                    code=ValidationError.FILE_NOT_FOUND,
                 )
-            )
+            ]
         except Exception as e:
+            return [
+                ValidationError.error(
+                    "guidance.md",
+                    f"Error reading file: {e}",
+                )
+            ]
+
+        return GuidanceSchema.validate_bytes(data)
+
+    @staticmethod
+    def validate_bytes(data: bytes) -> List[ValidationError]:
+        """Validate raw guidance.md contents."""
+        errors = []
+
+        try:
+            # Translate newlines as text-mode open() would, so CRLF files
+            # aren't counted as longer than the same text with LF endings
+            content = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n").strip()
+        except UnicodeDecodeError as e:
             errors.append(
-                ValidationError(
-                    ValidationError.ERROR,
+                ValidationError.error(
                     "guidance.md",
                     f"Error reading file: {e}",
                 )
             )
+            return errors
+
+        if not content:
+            errors.append(
+                ValidationError.error(
+                    "guidance.md",
+                    "File is empty - guidance content is required",
+                )
+            )
+        elif len(content) < 100:
+            errors.append(
+                ValidationError.warning(
+                    "guidance.md",
+                    f"File is very short ({len(content)} characters). "
+                    f"Consider providing more detailed guidance for the AI.",
+                )
+            )
 
         return errors
@@ -7,7 +7,9 @@ import pytest
 import json
 import yaml
 from pathlib import Path
-from typing import Dict, Any
+from PIL import Image
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
 
 
 # ============================================================================
@@ -113,10 +115,7 @@ def sample_rubric() -> Dict[str, Any]:
     }
 
 
-@pytest.fixture
-def sample_qmd_frontmatter() -> str:
-    """Sample YAML frontmatter from a Quarto document."""
-    return """---
+_SAMPLE_QMD_FRONTMATTER = """---
 title: "Project 1: Euler Method"
 author: "Student Name"
 format:
@@ -127,14 +126,17 @@ jupyter: python3
 ---"""
 
 
+@pytest.fixture(scope="session")
+def sample_qmd_frontmatter() -> str:
+    """Sample YAML frontmatter from a Quarto document."""
+    return _SAMPLE_QMD_FRONTMATTER
+
+
 # ============================================================================
 # FIXTURE: Sample Report Content (Quarto Markdown)
 # ============================================================================
 
-@pytest.fixture
-def sample_qmd_with_callouts() -> str:
-    """Quarto markdown with template callout boxes."""
-    return """---
+_SAMPLE_QMD_WITH_CALLOUTS = """---
 title: "Project 1: Euler Method"
 author: "Test Student"
 ---
@@ -173,10 +175,13 @@ Some results here.
 """
 
 
-@pytest.fixture
-def sample_qmd_with_embeds() -> str:
-    """Quarto markdown with notebook embeds."""
-    return """---
+@pytest.fixture(scope="session")
+def sample_qmd_with_callouts() -> str:
+    """Quarto markdown with template callout boxes."""
+    return _SAMPLE_QMD_WITH_CALLOUTS
+
+
+_SAMPLE_QMD_WITH_EMBEDS = """---
 title: "Project 1"
 author: "Student"
 ---
@@ -193,10 +198,13 @@ And the numerical results:
 """
 
 
-@pytest.fixture
-def sample_qmd_with_figures() -> str:
-    """Quarto markdown with figures."""
-    return """---
+@pytest.fixture(scope="session")
+def sample_qmd_with_embeds() -> str:
+    """Quarto markdown with notebook embeds."""
+    return _SAMPLE_QMD_WITH_EMBEDS
+
+
+_SAMPLE_QMD_WITH_FIGURES = """---
 title: "Project"
 author: "Student"
 ---
@@ -215,10 +223,13 @@ Figure 1 shows the setup:
 """
 
 
-@pytest.fixture
-def sample_qmd_complete() -> str:
-    """Complete realistic Quarto document with all elements."""
-    return """---
+@pytest.fixture(scope="session")
+def sample_qmd_with_figures() -> str:
+    """Quarto markdown with figures."""
+    return _SAMPLE_QMD_WITH_FIGURES
+
+
+_SAMPLE_QMD_COMPLETE = """---
 title: "Project 1: Euler Method"
 author: "Jane Doe"
 date: 2024-01-20
@@ -267,24 +278,30 @@ We successfully implemented the Euler method.
 """
 
 
+@pytest.fixture(scope="session")
+def sample_qmd_complete() -> str:
+    """Complete realistic Quarto document with all elements."""
+    return _SAMPLE_QMD_COMPLETE
+
+
 # ============================================================================
 # FIXTURE: Sample HTML Content
 # ============================================================================
 
-@pytest.fixture
-def sample_html_table_simple() -> str:
-    """Simple HTML table."""
-    return """<table>
+_SAMPLE_HTML_TABLE_SIMPLE = """<table>
 <tr><th>Step</th><th>Value</th></tr>
 <tr><td>1</td><td>0.0</td></tr>
 <tr><td>2</td><td>0.1</td></tr>
 </table>"""
 
 
-@pytest.fixture
-def sample_html_table_complex() -> str:
-    """HTML table with headers and multiple rows."""
-    return """<table>
+@pytest.fixture(scope="session")
+def sample_html_table_simple() -> str:
+    """Simple HTML table."""
+    return _SAMPLE_HTML_TABLE_SIMPLE
+
+
+_SAMPLE_HTML_TABLE_COMPLEX = """<table>
 <thead>
 <tr><th>Method</th><th>Error at t=1.0</th><th>Accuracy</th></tr>
 </thead>
@@ -296,30 +313,39 @@ def sample_html_table_complex() -> str:
 </table>"""
 
 
-@pytest.fixture
-def sample_html_list_unordered() -> str:
-    """HTML unordered list."""
-    return """<ul>
+@pytest.fixture(scope="session")
+def sample_html_table_complex() -> str:
+    """HTML table with headers and multiple rows."""
+    return _SAMPLE_HTML_TABLE_COMPLEX
+
+
+_SAMPLE_HTML_LIST_UNORDERED = """<ul>
 <li>First item</li>
 <li>Second item</li>
 <li>Third item</li>
 </ul>"""
 
 
-@pytest.fixture
-def sample_html_list_ordered() -> str:
-    """HTML ordered list."""
-    return """<ol>
+@pytest.fixture(scope="session")
+def sample_html_list_unordered() -> str:
+    """HTML unordered list."""
+    return _SAMPLE_HTML_LIST_UNORDERED
+
+
+_SAMPLE_HTML_LIST_ORDERED = """<ol>
 <li>Initialize y and t arrays</li>
 <li>For each time step, compute dy/dt</li>
 <li>Update y using y_{n+1} = y_n + dt * dy/dt</li>
 </ol>"""
 
 
-@pytest.fixture
-def sample_html_nested_lists() -> str:
-    """HTML with nested lists."""
-    return """<ul>
+@pytest.fixture(scope="session")
+def sample_html_list_ordered() -> str:
+    """HTML ordered list."""
+    return _SAMPLE_HTML_LIST_ORDERED
+
+
+_SAMPLE_HTML_NESTED_LISTS = """<ul>
 <li>Theory
 <ul>
 <li>Differential equations</li>
@@ -335,10 +361,13 @@ def sample_html_nested_lists() -> str:
 </ul>"""
 
 
-@pytest.fixture
-def sample_html_mixed_content() -> str:
-    """HTML with mixed tables, text, and lists."""
-    return """<p>Here are the results:</p>
+@pytest.fixture(scope="session")
+def sample_html_nested_lists() -> str:
+    """HTML with nested lists."""
+    return _SAMPLE_HTML_NESTED_LISTS
+
+
+_SAMPLE_HTML_MIXED_CONTENT = """<p>Here are the results:</p>
 <table>
 <tr><th>Parameter</th><th>Value</th></tr>
 <tr><td>dt</td><td>0.01</td></tr>
@@ -350,15 +379,18 @@ def sample_html_mixed_content() -> str:
 </ol>"""
 
 
+@pytest.fixture(scope="session")
+def sample_html_mixed_content() -> str:
+    """HTML with mixed tables, text, and lists."""
+    return _SAMPLE_HTML_MIXED_CONTENT
+
+
 # ============================================================================
 # FIXTURE: Sample Report Structure (Parsed)
 # ============================================================================
 
-@pytest.fixture
-def sample_parsed_report() -> Dict[str, Any]:
-    """Sample parsed report structure (what parse_report.py produces)."""
-    return {
-        'content': """# Theory & Explanation
+_SAMPLE_PARSED_REPORT = MappingProxyType({
+    'content': """# Theory & Explanation
 
 The Euler method approximates solutions to differential equations.
 
@@ -379,62 +411,74 @@ The error decreases with smaller step sizes.
 
 We successfully implemented the Euler method.
 """,
-        'metadata': {
-            'title': 'Project 1: Euler Method',
-            'author': 'Test Student',
-            'date': '2024-01-20',
-        },
-        'structure': [
-            {'level': 1, 'heading': 'Theory & Explanation'},
-            {'level': 2, 'heading': 'Implementation'},
-            {'level': 2, 'heading': 'Results'},
-            {'level': 2, 'heading': 'Conclusion'},
-        ],
-        'figures': {
-            'count': 1,
-            'details': [
-                {
-                    'caption': 'Convergence Plot',
-                    'path': 'output/convergence.png',
-                    'type': 'markdown',
-                }
-            ]
-        },
-        'stats': {
-            'word_count': 95,
-            'code_block_count': 1,
-            'equation_count': 0,
-            'figure_count': 1,
-        }
+    'metadata': {
+        'title': 'Project 1: Euler Method',
+        'author': 'Test Student',
+        'date': '2024-01-20',
+    },
+    'structure': [
+        {'level': 1, 'heading': 'Theory & Explanation'},
+        {'level': 2, 'heading': 'Implementation'},
+        {'level': 2, 'heading': 'Results'},
+        {'level': 2, 'heading': 'Conclusion'},
+    ],
+    'figures': {
+        'count': 1,
+        'details': [
+            {
+                'caption': 'Convergence Plot',
+                'path': 'output/convergence.png',
+                'type': 'markdown',
+            }
+        ]
+    },
+    'stats': {
+        'word_count': 95,
+        'code_block_count': 1,
+        'equation_count': 0,
+        'figure_count': 1,
     }
+})
+
+
+@pytest.fixture(scope="session")
+def sample_parsed_report() -> Mapping[str, Any]:
+    """Sample parsed report structure (what parse_report.py produces)."""
+    return _SAMPLE_PARSED_REPORT
 
 
 # ============================================================================
 # FIXTURE: Sample Criterion Configuration
 # ============================================================================
 
-@pytest.fixture
-def sample_criterion() -> Dict[str, Any]:
+_SAMPLE_CRITERION = MappingProxyType({
+    'id': 'implementation',
+    'name': 'Implementation/Code',
+    'weight': 40,
+    'vision_enabled': False,
+    'auto_detect_images': False,
+})
+
+
+@pytest.fixture(scope="session")
+def sample_criterion() -> Mapping[str, Any]:
     """Sample criterion for feedback analysis."""
-    return {
-        'id': 'implementation',
-        'name': 'Implementation/Code',
-        'weight': 40,
-        'vision_enabled': False,
-        'auto_detect_images': False,
-    }
+    return _SAMPLE_CRITERION
 
 
-@pytest.fixture
-def sample_criterion_with_vision() -> Dict[str, Any]:
+_SAMPLE_CRITERION_WITH_VISION = MappingProxyType({
+    'id': 'results',
+    'name': 'Results',
+    'weight': 20,
+    'vision_enabled': True,
+    'auto_detect_images': True,
+})
+
+
+@pytest.fixture(scope="session")
+def sample_criterion_with_vision() -> Mapping[str, Any]:
     """Sample criterion with vision enabled."""
-    return {
-        'id': 'results',
-        'name': 'Results',
-        'weight': 20,
-        'vision_enabled': True,
-        'auto_detect_images': True,
-    }
+    return _SAMPLE_CRITERION_WITH_VISION
 
 
 # ============================================================================
@@ -453,18 +497,58 @@ def fixture_dir():
     return Path(__file__).parent / 'fixtures'
 
 
+@pytest.fixture
+def stub_image_tokens(monkeypatch):
+    """
+    Returns stub(tokens, default=0) that replaces image_utils.estimate_image_tokens
+    with a plain lookup of each path's token count in the tokens dict.
+    """
+    def stub(tokens, default=0):
+        monkeypatch.setattr('image_utils.estimate_image_tokens',
+                            lambda path, max_dimension=None: tokens.get(path, default))
+
+    return stub
+
+
+@pytest.fixture(scope="session")
+def image_factory(tmp_path_factory):
+    """
+    Returns make(mode, size, color, format='PNG') -> Path of a solid-colour image.
+
+    Each distinct image is written once per session (PNGs at the fastest
+    compression level) and shared, so tests must not modify the files.
+    """
+    image_dir = tmp_path_factory.mktemp('images')
+    paths = {}
+
+    def make(mode, size, color=0, format='PNG'):
+        key = (mode, size, color, format)
+        if key not in paths:
+            suffix = '.jpg' if format == 'JPEG' else f'.{format.lower()}'
+            path = image_dir / f'image_{len(paths)}{suffix}'
+            options = {'compress_level': 1} if format == 'PNG' else {}
+            Image.new(mode, size, color).save(path, format=format, **options)
+            paths[key] = path
+        return paths[key]
+
+    return make
+
+
 # ============================================================================
 # SAMPLE DATA for Image Token Calculation
 # ============================================================================
 
-@pytest.fixture
-def image_dimensions_samples() -> Dict[str, tuple]:
+_IMAGE_DIMENSIONS_SAMPLES = MappingProxyType({
+    'small': (256, 256),         # 1x1 tiles -> 85 + 170 = 255 tokens
+    'medium': (512, 512),        # 1x1 tiles -> 85 + 170 = 255 tokens
+    'large': (1024, 1024),       # 2x2 tiles -> 85 + 4*170 = 765 tokens
+    'portrait': (512, 1024),     # 1x2 tiles -> 85 + 2*170 = 425 tokens
+    'landscape': (1024, 512),    # 2x1 tiles -> 85 + 2*170 = 425 tokens
+    'very_large': (2048, 2048),  # 4x4 tiles -> 85 + 16*170 = 2805 tokens
+})
+
+
+@pytest.fixture(scope="session")
+def image_dimensions_samples() -> Mapping[str, tuple]:
     """Sample image dimensions for token calculation testing."""
-    return {
-        'small': (256, 256),         # 1x1 tiles -> 85 + 170 = 255 tokens
-        'medium': (512, 512),        # 1x1 tiles -> 85 + 170 = 255 tokens
-        'large': (1024, 1024),       # 2x2 tiles -> 85 + 4*170 = 765 tokens
-        'portrait': (512, 1024),     # 1x2 tiles -> 85 + 2*170 = 425 tokens
-        'landscape': (1024, 512),    # 2x1 tiles -> 85 + 2*170 = 425 tokens
-        'very_large': (2048, 2048),  # 4x4 tiles -> 85 + 16*170 = 2805 tokens
-    }
+    return _IMAGE_DIMENSIONS_SAMPLES
@@ -6,11 +6,6 @@ dependencies, making them ideal for comprehensive deterministic testing.
 """
 
 import pytest
-import sys
-from pathlib import Path
-
-# Add the scripts directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'dot_github_folder' / 'scripts'))
 
 from html_to_markdown import (
     html_table_to_markdown,
@@ -33,21 +28,15 @@ class TestHtmlTableToMarkdown:
         assert '---' in result or '| --- |' in result
 
         # Should contain all cell values
-        assert 'Step' in result
-        assert 'Value' in result
-        assert '0.0' in result
-        assert '0.1' in result
+        assert {'Step', 'Value', '0.0', '0.1'} <= set(result.split())
 
     def test_complex_table(self, sample_html_table_complex):
         """Test conversion of a more complex table with multiple rows."""
         result = html_table_to_markdown(sample_html_table_complex)
 
         # Check structure
-        assert '|' in result  # Markdown table pipe
-        assert 'Method' in result
+        assert {'|', 'Method', 'Euler', 'RK4'} <= set(result.split())  # Pipe-separated cells
         assert 'Error at t=1.0' in result
-        assert 'Euler' in result
-        assert 'RK4' in result
 
     def test_table_with_empty_cells(self):
         """Test table with empty cells."""
@@ -223,6 +212,13 @@ class TestHtmlToMarkdown:
         # Should handle gracefully
         assert isinstance(result, str)
 
+    def test_repeated_table(self, sample_html_table_simple):
+        """Test that every copy of a repeated table is converted."""
+        result = html_to_markdown(sample_html_table_simple + "<p>between</p>" + sample_html_table_simple)
+
+        assert '<table' not in result
+        assert result.count('| --- |') == 2
+
 
 @pytest.mark.deterministic
 @pytest.mark.unit
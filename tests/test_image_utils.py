@@ -10,15 +10,14 @@ Tests cover:
 """
 
 import pytest
-import sys
+import base64
 import io
+import threading
+import time
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
 from PIL import Image
 
-# Add the scripts directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'dot_github_folder' / 'scripts'))
-
+import image_utils
 from image_utils import (
     estimate_image_tokens,
     filter_images_by_token_budget,
@@ -32,39 +31,37 @@ from image_utils import (
     MIN_RESOLUTION,
 )
 
+# Known image sizes and their expected GPT-4V token cost (85 + 170 per 512px tile)
+IMAGE_DIMENSIONS = {
+    'small': (256, 256),
+    'medium': (512, 512),
+    'large': (1024, 1024),
+    'portrait': (512, 1024),
+    'landscape': (1024, 512),
+    'very_large': (2048, 2048),
+    'oversized': (4096, 1024),
+}
+
 
 @pytest.mark.deterministic
 @pytest.mark.unit
 class TestEncodeImageToJpeg:
     """Tests for JPEG encoding with format conversion."""
 
-    def test_encode_rgb_image(self):
-        """Test encoding a standard RGB image."""
-        img = Image.new('RGB', (100, 100), color='red')
+    @pytest.mark.parametrize("mode,color", [
+        ('RGB', 'red'),
+        ('RGBA', (255, 0, 0, 128)),  # Semi-transparent red, composited onto white
+        ('L', 128),                  # Grayscale, converted to RGB
+    ])
+    def test_encode_converts_mode_to_jpeg(self, mode, color):
+        """Test that RGB, RGBA and grayscale images all encode to valid JPEG."""
+        img = Image.new(mode, (100, 100), color=color)
         jpeg_bytes = encode_image_to_jpeg(img, quality=85)
 
         assert jpeg_bytes is not None
         assert len(jpeg_bytes) > 0
         assert jpeg_bytes.startswith(b'\xff\xd8')  # JPEG magic bytes
 
-    def test_encode_rgba_converts_to_rgb(self):
-        """Test that RGBA images are converted to RGB with white background."""
-        # Create RGBA image with transparency
-        img = Image.new('RGBA', (100, 100), color=(255, 0, 0, 128))  # Semi-transparent red
-        jpeg_bytes = encode_image_to_jpeg(img, quality=85)
-
-        assert jpeg_bytes is not None
-        assert len(jpeg_bytes) > 0
-        assert jpeg_bytes.startswith(b'\xff\xd8')  # Valid JPEG
-
-    def test_encode_grayscale_converts_to_rgb(self):
-        """Test that grayscale images are converted to RGB."""
-        img = Image.new('L', (100, 100), color=128)
-        jpeg_bytes = encode_image_to_jpeg(img, quality=85)
-
-        assert jpeg_bytes is not None
-        assert len(jpeg_bytes) > 0
-
     def test_quality_affects_size(self):
         """Test that higher quality produces larger JPEG."""
         # Create a complex image that will compress differently
@@ -88,33 +85,38 @@ class TestEncodeImageToJpeg:
 class TestEstimateJpegSize:
     """Tests for JPEG size estimation."""
 
-    def test_estimate_simple_image(self, tmp_path):
+    def test_estimate_simple_image(self, image_factory):
         """Test size estimation for a simple image."""
-        img = Image.new('RGB', (100, 100), color='red')
-        img_path = tmp_path / "test.png"
-        img.save(img_path)
+        img_path = image_factory('RGB', (100, 100), 'red')
 
         size = estimate_jpeg_size(str(img_path), max_dimension=None, quality=85)
 
         assert size > 0
         assert isinstance(size, int)
 
-    def test_estimate_with_resize(self, tmp_path):
+    def test_estimate_with_resize(self, image_factory):
         """Test that resizing reduces estimated size."""
-        img = Image.new('RGB', (500, 500), color='blue')
-        img_path = tmp_path / "test.png"
-        img.save(img_path)
+        img_path = image_factory('RGB', (500, 500), 'blue')
 
         size_full = estimate_jpeg_size(str(img_path), max_dimension=None, quality=85)
         size_resized = estimate_jpeg_size(str(img_path), max_dimension=250, quality=85)
 
         assert size_resized < size_full
 
-    def test_estimate_quality_impact(self, tmp_path):
+    def test_estimate_with_resize_jpeg(self, tmp_path):
+        """Test that resizing a JPEG (decoded at reduced scale) reduces estimated size."""
+        img = Image.effect_noise((1600, 1200), 64).convert('RGB')
+        img_path = tmp_path / "photo.jpg"
+        img.save(img_path, quality=90)
+
+        size_full = estimate_jpeg_size(str(img_path), max_dimension=None, quality=80)
+        size_resized = estimate_jpeg_size(str(img_path), max_dimension=400, quality=80)
+
+        assert 0 < size_resized < size_full
+
+    def test_estimate_quality_impact(self, image_factory):
         """Test that quality reduction reduces estimated size."""
-        img = Image.new('RGB', (200, 200), color='green')
-        img_path = tmp_path / "test.png"
-        img.save(img_path)
+        img_path = image_factory('RGB', (200, 200), 'green')
 
         size_q85 = estimate_jpeg_size(str(img_path), max_dimension=None, quality=85)
         size_q65 = estimate_jpeg_size(str(img_path), max_dimension=None, quality=65)
@@ -129,6 +131,26 @@ class TestEstimateJpegSize:
 
         assert size == 0
 
+    def test_estimate_jpeg_uses_file_size(self, tmp_path):
+        """Test that a full-size, high-quality JPEG is estimated from its file size."""
+        img_path = tmp_path / "photo.jpg"
+        Image.effect_noise((200, 200), 64).convert('RGB').save(img_path, quality=95)
+
+        size = estimate_jpeg_size(str(img_path), max_dimension=None, quality=85)
+
+        assert size == int(img_path.stat().st_size * image_utils.BASE64_OVERHEAD)
+
+    def test_estimate_tracks_file_changes(self, tmp_path):
+        """Test that cached estimates are refreshed when the file is rewritten."""
+        img_path = tmp_path / "test.png"
+        Image.new('RGB', (50, 50), color='red').save(img_path)
+        size_small = estimate_jpeg_size(str(img_path), max_dimension=None, quality=85)
+
+        Image.effect_noise((400, 400), 64).convert('RGB').save(img_path)
+        size_large = estimate_jpeg_size(str(img_path), max_dimension=None, quality=85)
+
+        assert size_large > size_small
+
 
 @pytest.mark.deterministic
 @pytest.mark.unit
@@ -177,12 +199,10 @@ class TestEstimateTotalPayloadSize:
 class TestOptimizeImagesForPayload:
     """Tests for adaptive image optimization."""
 
-    def test_optimize_small_payload_no_reduction(self, tmp_path):
+    def test_optimize_small_payload_no_reduction(self, image_factory):
         """Test that small payloads don't require optimization."""
         # Create a small image
-        img = Image.new('RGB', (100, 100), color='red')
-        img_path = tmp_path / "test.png"
-        img.save(img_path)
+        img_path = image_factory('RGB', (100, 100), 'red')
 
         optimized = optimize_images_for_payload(
             image_paths=[str(img_path)],
@@ -195,12 +215,10 @@ class TestOptimizeImagesForPayload:
         assert len(optimized) > 0
         assert optimized[0]['quality'] == 85  # No quality reduction needed
 
-    def test_optimize_quality_reduction(self, tmp_path):
+    def test_optimize_quality_reduction(self, image_factory):
         """Test that optimization reduces quality when needed."""
         # Create images that would exceed payload
-        img = Image.new('RGB', (800, 600), color='blue')
-        img_path = tmp_path / "test.png"
-        img.save(img_path)
+        img_path = image_factory('RGB', (800, 600), 'blue')
 
         # Use very tight budget to force quality reduction
         optimized = optimize_images_for_payload(
@@ -214,14 +232,12 @@ class TestOptimizeImagesForPayload:
             # If images fit, quality should be reduced or resolution reduced
             assert optimized[0]['quality'] <= 85
 
-    def test_optimize_keeps_all_images_when_possible(self, tmp_path):
+    def test_optimize_keeps_all_images_when_possible(self, image_factory):
         """Test that optimization tries to keep all images."""
         # Create three small images
         image_paths = []
         for i in range(3):
-            img = Image.new('RGB', (150, 150), color=(i*80, i*80, i*80))
-            img_path = tmp_path / f"test_{i}.png"
-            img.save(img_path)
+            img_path = image_factory('RGB', (150, 150), (i*80, i*80, i*80))
             image_paths.append(str(img_path))
 
         optimized = optimize_images_for_payload(
@@ -234,11 +250,9 @@ class TestOptimizeImagesForPayload:
         # Should keep all 3 images if possible
         assert len(optimized) == 3
 
-    def test_optimize_fallback_quality_then_resolution(self, tmp_path):
+    def test_optimize_fallback_quality_then_resolution(self, image_factory):
         """Test that optimization tries quality and resolution adjustments."""
-        img = Image.new('RGB', (600, 600), color='cyan')
-        img_path = tmp_path / "test.png"
-        img.save(img_path)
+        img_path = image_factory('RGB', (600, 600), 'cyan')
 
         # Tight budget that forces optimization
         optimized = optimize_images_for_payload(
@@ -262,11 +276,9 @@ class TestOptimizeImagesForPayload:
 
         assert len(optimized) == 0
 
-    def test_optimize_respects_max_payload(self, tmp_path):
+    def test_optimize_respects_max_payload(self, image_factory):
         """Test that optimized payload respects max_payload_mb."""
-        img = Image.new('RGB', (300, 300), color='yellow')
-        img_path = tmp_path / "test.png"
-        img.save(img_path)
+        img_path = image_factory('RGB', (300, 300), 'yellow')
 
         optimized = optimize_images_for_payload(
             image_paths=[str(img_path)],
@@ -280,17 +292,109 @@ class TestOptimizeImagesForPayload:
             total_size = 100000 + sum(len(img['base64_data']) for img in optimized)
             assert total_size < 2.5 * 1024 * 1024
 
+    def test_optimize_passes_small_jpeg_through(self, tmp_path):
+        """Test that a JPEG that needs no resize is sent without re-encoding."""
+        img_path = tmp_path / "photo.jpg"
+        Image.effect_noise((300, 200), 64).convert('RGB').save(img_path, quality=80)
+
+        optimized = optimize_images_for_payload(
+            image_paths=[str(img_path)],
+            text_size_bytes=50000,
+            config={'vision': {'resize_max_dimension': 768}},
+            max_payload_mb=2.5
+        )
+
+        assert optimized[0]['base64_data'] == image_utils.encode_image_simple(str(img_path))
+        assert optimized[0]['quality'] is None  # Bytes keep the file's own quality
+
+    def test_optimize_reencodes_jpeg_with_exif(self, tmp_path):
+        """Test that a JPEG carrying EXIF (e.g. GPS, camera make) is re-encoded without it."""
+        img_path = tmp_path / "phone.jpg"
+        exif = Image.Exif()
+        exif[0x010F] = "PhoneMaker"  # Make
+        exif[0x8825] = {2: (39.0, 46.0, 0.0)}  # GPS IFD: latitude
+        Image.effect_noise((600, 400), 64).convert('RGB').save(img_path, quality=92, exif=exif)
+
+        optimized = optimize_images_for_payload(
+            image_paths=[str(img_path)],
+            text_size_bytes=50000,
+            config={'vision': {'resize_max_dimension': 768}},
+            max_payload_mb=2.5
+        )
+
+        jpeg_bytes = base64.b64decode(optimized[0]['base64_data'].split(',', 1)[1])
+        with Image.open(io.BytesIO(jpeg_bytes)) as sent:
+            assert not sent.info.get('exif')
+            assert not sent.getexif()
+        assert optimized[0]['quality'] == 85
+
+    def test_optimize_threaded_matches_sequential(self, tmp_path, monkeypatch):
+        """Test that encoding on worker threads selects the same images and bytes."""
+        image_paths = []
+        for i, size in enumerate([(900, 700), (300, 200), (500, 800)]):
+            img_path = tmp_path / f"noise{i}.png"
+            Image.effect_noise(size, 64).convert('RGB').save(img_path)
+            image_paths.append(str(img_path))
+
+        def optimize():
+            return optimize_images_for_payload(
+                image_paths=image_paths,
+                text_size_bytes=50000,
+                config={'vision': {'resize_max_dimension': 768}},
+                max_payload_mb=0.3
+            )
+
+        monkeypatch.setattr(image_utils.os, 'cpu_count', lambda: 1)
+        sequential = optimize()
+        monkeypatch.setattr(image_utils.os, 'cpu_count', lambda: 4)
+        threaded = optimize()
+
+        assert sequential
+        assert threaded == sequential
+        assert all(img['size_bytes'] == len(img['base64_data']) for img in threaded)
+
+    def test_optimize_never_overlaps_encodes_of_one_resized_image(self, monkeypatch):
+        """Test that a step's leftover encodes finish before the next step reuses their image."""
+        image_paths = [f"img{i}.png" for i in range(4)]
+        size_for_quality = {85: 400_000, 75: 200_000, 65: 100_000}
+        active = set()
+        overlaps = []
+        lock = threading.Lock()
+
+        def fake_encode(img_path, resolution, quality, resized_images):
+            key = (img_path, resolution)
+            with lock:
+                if key in active:
+                    overlaps.append((img_path, quality))
+                active.add(key)
+            # Later images finish later, so they are still running when a step breaks early
+            time.sleep(0.02 * (1 + image_paths.index(img_path)))
+            with lock:
+                active.discard(key)
+            return b'x' * size_for_quality[quality], quality
+
+        monkeypatch.setattr(image_utils, '_encode_payload_image', fake_encode)
+        monkeypatch.setattr(image_utils.os, 'cpu_count', lambda: 8)
+
+        # q85 breaks after one image and q75 after two; only q65 fits all four
+        result = optimize_images_for_payload(
+            image_paths=image_paths,
+            text_size_bytes=0,
+            max_payload_mb=610_000 / (1024 * 1024)
+        )
+
+        assert [img['quality'] for img in result] == [65] * 4
+        assert overlaps == []
+
 
 @pytest.mark.deterministic
 @pytest.mark.unit
 class TestEstimateImageTokens:
     """Tests for image token estimation from actual image files."""
 
-    def test_estimate_tokens_for_existing_file(self, tmp_path):
+    def test_estimate_tokens_for_existing_file(self, image_factory):
         """Test token estimation for an actual image file."""
-        img = Image.new('RGB', (512, 512), color='red')
-        img_path = tmp_path / "test.png"
-        img.save(img_path)
+        img_path = image_factory('RGB', (512, 512), 'red')
 
         # Should estimate tokens without errors
         tokens = estimate_image_tokens(str(img_path), max_dimension=None)
@@ -298,11 +402,9 @@ class TestEstimateImageTokens:
         assert isinstance(tokens, int)
         assert tokens > 0
 
-    def test_estimate_tokens_with_resize(self, tmp_path):
+    def test_estimate_tokens_with_resize(self, image_factory):
         """Test that max_dimension reduces token count."""
-        img = Image.new('RGB', (2048, 2048), color='blue')
-        img_path = tmp_path / "test.png"
-        img.save(img_path)
+        img_path = image_factory('RGB', (2048, 2048), 'blue')
 
         tokens_full = estimate_image_tokens(str(img_path), max_dimension=None)
         tokens_resized = estimate_image_tokens(str(img_path), max_dimension=1024)
@@ -316,47 +418,65 @@ class TestEstimateImageTokens:
         # Should return reasonable estimate or 0
         assert tokens >= 0
 
+    @pytest.mark.parametrize("name,expected", [
+        ('small', 255),
+        ('medium', 255),
+        ('large', 765),
+        ('portrait', 425),
+        ('landscape', 425),
+        ('very_large', 2805),
+        ('oversized', 765),
+    ])
+    def test_token_calculation_with_various_sizes(self, name, expected):
+        """Test token cost for known dimensions, computed once per size."""
+        assert estimate_image_tokens("test.png", dimensions=IMAGE_DIMENSIONS[name]) == expected
+
+    def test_estimate_tokens_from_known_dimensions(self, image_factory):
+        """Test that known dimensions give the same estimate without opening the file."""
+        img_path = image_factory('RGB', (3000, 1000), 'green')
+
+        for max_dimension in (None, 1024):
+            from_file = estimate_image_tokens(str(img_path), max_dimension=max_dimension)
+            from_size = estimate_image_tokens(
+                "/nonexistent/file.png", max_dimension=max_dimension, dimensions=(3000, 1000)
+            )
+            assert from_size == from_file
+
 
 @pytest.mark.deterministic
 @pytest.mark.unit
 class TestFilterImagesByTokenBudget:
     """Tests for greedy token budget filtering logic."""
 
-    def test_single_image_under_budget(self):
+    def test_single_image_under_budget(self, stub_image_tokens):
         """Test single image that fits in budget."""
         images = ['image1.png']
         image_tokens = {'image1.png': 255}
 
-        with patch('image_utils.estimate_image_tokens') as mock_est:
-            def mock_tokens(path, max_dimension=None):
-                return image_tokens.get(path, 0)
-            mock_est.side_effect = mock_tokens
-            selected, total_tokens = filter_images_by_token_budget(
-                images, max_tokens=1000
-            )
+        stub_image_tokens(image_tokens)
+        selected, total_tokens = filter_images_by_token_budget(
+            images, max_tokens=1000
+        )
 
         assert len(selected) == 1
         assert selected[0] == 'image1.png'
         assert total_tokens == 255
 
-    def test_single_image_exceeds_budget(self):
+    def test_single_image_exceeds_budget(self, stub_image_tokens):
         """Test single image that exceeds budget."""
         images = ['image1.png']
         image_tokens = {'image1.png': 2000}
 
-        with patch('image_utils.estimate_image_tokens') as mock_est:
-            def mock_tokens(path, max_dimension=None):
-                return image_tokens.get(path, 0)
-            mock_est.side_effect = mock_tokens
-            selected, total_tokens = filter_images_by_token_budget(
-                images, max_tokens=1000
-            )
+        stub_image_tokens(image_tokens)
+        selected, total_tokens = filter_images_by_token_budget(
+            images, max_tokens=1000
+        )
 
         # Even if it exceeds, might still include it or exclude it depending on impl
         assert isinstance(selected, list)
         assert total_tokens >= 0
 
-    def test_multiple_images_fit_in_budget(self):
+    def test_multiple_images_fit_in_budget(self, stub_image_tokens):
         """Test multiple images that all fit in budget."""
         images = ['img1.png', 'img2.png', 'img3.png']
         image_tokens = {
@@ -365,18 +485,15 @@ class TestFilterImagesByTokenBudget:
             'img3.png': 255,
         }
 
-        with patch('image_utils.estimate_image_tokens') as mock_est:
-            def mock_tokens(path, max_dimension=None):
-                return image_tokens.get(path, 0)
-            mock_est.side_effect = mock_tokens
-            selected, total_tokens = filter_images_by_token_budget(
-                images, max_tokens=1000
-            )
+        stub_image_tokens(image_tokens)
+        selected, total_tokens = filter_images_by_token_budget(
+            images, max_tokens=1000
+        )
 
         assert len(selected) >= 2
         assert total_tokens <= 1000
 
-    def test_multiple_images_partial_fit(self):
+    def test_multiple_images_partial_fit(self, stub_image_tokens):
         """Test multiple images where only some fit in budget."""
         images = ['img1.png', 'img2.png', 'img3.png']
         image_tokens = {
@@ -385,18 +502,15 @@ class TestFilterImagesByTokenBudget:
             'img3.png': 400,
         }
 
-        with patch('image_utils.estimate_image_tokens') as mock_est:
-            def mock_tokens(path, max_dimension=None):
-                return image_tokens.get(path, 0)
-            mock_est.side_effect = mock_tokens
-            selected, total_tokens = filter_images_by_token_budget(
-                images, max_tokens=750
-            )
+        stub_image_tokens(image_tokens)
+        selected, total_tokens = filter_images_by_token_budget(
+            images, max_tokens=750
+        )
 
         # Should fit first two images at most
         assert total_tokens <= 750
 
-    def test_budget_exactly_met(self):
+    def test_budget_exactly_met(self, stub_image_tokens):
         """Test when total tokens exactly match budget."""
         images = ['img1.png', 'img2.png']
         image_tokens = {
@@ -404,13 +518,10 @@ class TestFilterImagesByTokenBudget:
             'img2.png': 500,
         }
 
-        with patch('image_utils.estimate_image_tokens') as mock_est:
-            def mock_tokens(path, max_dimension=None):
-                return image_tokens.get(path, 0)
-            mock_est.side_effect = mock_tokens
-            selected, total_tokens = filter_images_by_token_budget(
-                images, max_tokens=1000
-            )
+        stub_image_tokens(image_tokens)
+        selected, total_tokens = filter_images_by_token_budget(
+            images, max_tokens=1000
+        )
 
         assert total_tokens == 1000
         assert len(selected) == 2
@@ -422,22 +533,19 @@ class TestFilterImagesByTokenBudget:
         assert len(selected) == 0
         assert total_tokens == 0
 
-    def test_zero_budget(self):
+    def test_zero_budget(self, stub_image_tokens):
         """Test with zero token budget."""
         images = ['img1.png']
 
-        with patch('image_utils.estimate_image_tokens') as mock_est:
-            def mock_tokens(path, max_dimension=None):
-                return 255
-            mock_est.side_effect = mock_tokens
-            selected, total_tokens = filter_images_by_token_budget(
-                images, max_tokens=0
-            )
+        stub_image_tokens({}, default=255)
+        selected, total_tokens = filter_images_by_token_budget(
+            images, max_tokens=0
+        )
 
         assert len(selected) == 0
         assert total_tokens == 0
 
-    def test_greedy_algorithm_efficiency(self):
+    def test_greedy_algorithm_efficiency(self, stub_image_tokens):
         """Test that greedy algorithm selects images efficiently."""
         images = ['small.png', 'medium.png', 'large.png']
         image_tokens = {
@@ -446,28 +554,22 @@ class TestFilterImagesByTokenBudget:
             'large.png': 900,
         }
 
-        with patch('image_utils.estimate_image_tokens') as mock_est:
-            def mock_tokens(path, max_dimension=None):
-                return image_tokens.get(path, 0)
-            mock_est.side_effect = mock_tokens
-            selected, total_tokens = filter_images_by_token_budget(
-                images, max_tokens=1000
-            )
+        stub_image_tokens(image_tokens)
+        selected, total_tokens = filter_images_by_token_budget(
+            images, max_tokens=1000
+        )
 
         # Should stay within budget
         assert total_tokens <= 1000
 
-    def test_filtering_deterministic(self):
+    def test_filtering_deterministic(self, stub_image_tokens):
         """Test that filtering is deterministic for same inputs."""
         images = ['img1.png', 'img2.png']
 
-        with patch('image_utils.estimate_image_tokens') as mock_est:
-            def mock_tokens(path, max_dimension=None):
-                return 250
-            mock_est.side_effect = mock_tokens
+        stub_image_tokens({}, default=250)
 
-            result1 = filter_images_by_token_budget(images, max_tokens=500)
-            result2 = filter_images_by_token_budget(images, max_tokens=500)
+        result1 = filter_images_by_token_budget(images, max_tokens=500)
+        result2 = filter_images_by_token_budget(images, max_tokens=500)
 
         assert result1 == result2
 
@@ -477,21 +579,17 @@ class TestFilterImagesByTokenBudget:
 class TestValidateImageFile:
     """Tests for image file validation (extension and existence checking)."""
 
-    def test_valid_existing_png_file(self, tmp_path):
+    def test_valid_existing_png_file(self, image_factory):
         """Test validation of existing PNG file."""
-        img = Image.new('RGB', (100, 100), color='red')
-        img_path = tmp_path / "test.png"
-        img.save(img_path)
+        img_path = image_factory('RGB', (100, 100), 'red')
 
         result = validate_image_file(str(img_path))
 
         assert result is True
 
-    def test_valid_existing_jpg_file(self, tmp_path):
+    def test_valid_existing_jpg_file(self, image_factory):
         """Test validation of existing JPG file."""
-        img = Image.new('RGB', (100, 100), color='green')
-        img_path = tmp_path / "test.jpg"
-        img.save(img_path)
+        img_path = image_factory('RGB', (100, 100), 'green', format='JPEG')
 
         result = validate_image_file(str(img_path))
 
@@ -512,6 +610,21 @@ class TestValidateImageFile:
 
         assert result is False
 
+    def test_directory_is_rejected(self, tmp_path):
+        """Test that a directory with an image-like name is not valid."""
+        dir_path = tmp_path / "figure.png"
+        dir_path.mkdir()
+
+        assert validate_image_file(str(dir_path)) is False
+
+    def test_uppercase_extension_is_accepted(self, tmp_path):
+        """Test that the extension check ignores case."""
+        img_path = tmp_path / "FIGURE.PNG"
+        Image.new('RGB', (10, 10)).save(img_path, format='PNG')
+
+        assert validate_image_file(str(img_path)) is True
+        assert validate_image_file(str(img_path), supported_formats=['jpg']) is False
+
     def test_valid_extension_format(self):
         """Test that extension validation works for format checking."""
         # These should be recognized as valid formats based on extension
@@ -529,14 +642,12 @@ class TestValidateImageFile:
 class TestPayloadOptimizationIntegration:
     """Integration tests for complete payload optimization workflow."""
 
-    def test_optimization_workflow_with_real_images(self, tmp_path):
+    def test_optimization_workflow_with_real_images(self, image_factory):
         """Test complete optimization workflow with real image files."""
         # Create test images
         image_paths = []
         for i in range(3):
-            img = Image.new('RGB', (200, 200), color=(i*80, i*80, i*80))
-            img_path = tmp_path / f"test_{i}.png"
-            img.save(img_path)
+            img_path = image_factory('RGB', (200, 200), (i*80, i*80, i*80))
             image_paths.append(str(img_path))
 
         # Run optimization
@@ -556,12 +667,10 @@ class TestPayloadOptimizationIntegration:
             assert 'resolution' in img_data
             assert img_data['base64_data'].startswith('data:image/jpeg;base64,')
 
-    def test_optimization_quality_reduction_works(self, tmp_path):
+    def test_optimization_quality_reduction_works(self, image_factory):
         """Test that quality reduction occurs under tight budget."""
         # Create one large image
-        img = Image.new('RGB', (800, 600), color='blue')
-        img_path = tmp_path / "large.png"
-        img.save(img_path)
+        img_path = image_factory('RGB', (800, 600), 'blue')
 
         # Tight budget to force optimization
         optimized = optimize_images_for_payload(
@@ -6,11 +6,6 @@ without depending on file I/O or external images.
 """
 
 import pytest
-import sys
-from pathlib import Path
-
-# Add the scripts directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'dot_github_folder' / 'scripts'))
 
 from parse_report import (
     _get_yaml_metadata,
@@ -196,6 +191,13 @@ Even more"""
 
         assert any("Introduction" in h['heading'] for h in structure)
 
+    def test_comments_in_code_blocks_ignored(self):
+        """Test that comment lines inside fenced code are not headings."""
+        body = "# Method\n\n```{python}\n# integrate the ODE\nx = 1\n```\n\n## Results"
+        structure = _extract_structure(body)
+
+        assert structure == [{'level': 1, 'text': 'Method'}, {'level': 2, 'text': 'Results'}]
+
 
 @pytest.mark.deterministic
 @pytest.mark.unit
@@ -349,6 +351,28 @@ Text with results."""
         assert stats.get('code_block_count') >= 1
         assert stats.get('figure_count') == 1
 
+    def test_math_inside_code_not_counted(self):
+        """Test that $...$ in a code cell is neither an equation nor prose."""
+        body = """Energy is $E = mc^2$ here.
+
+```{python}
+plt.xlabel(r'$t$ (s)')
+```
+"""
+        stats = _calculate_stats(body, figure_count=0)
+
+        assert stats['equations'] == 1
+        assert stats['code_blocks'] == 1
+        assert stats['word_count'] == 3
+
+    def test_dollar_amounts_do_not_swallow_code_blocks(self):
+        """Test that prose dollar signs around a code cell don't hide the cell."""
+        body = "Costs $5 per run.\n\n```{python}\nx = 1\n```\n\nBudget is $10 total.\n"
+        stats = _calculate_stats(body, figure_count=0)
+
+        assert stats['code_blocks'] == 1
+        assert stats['equations'] == 0
+
 
 @pytest.mark.deterministic
 @pytest.mark.unit
@@ -6,13 +6,9 @@ making them fully deterministic and ideal for comprehensive testing.
 """
 
 import pytest
-import sys
 import tempfile
 from pathlib import Path
 
-# Add the scripts directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'dot_github_folder' / 'scripts'))
-
 from rubric_converter import (
     yaml_to_markdown,
     markdown_to_yaml,
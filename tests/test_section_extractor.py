@@ -9,11 +9,6 @@ Tests focus on the decision logic and text processing without API calls:
 """
 
 import pytest
-import sys
-from pathlib import Path
-
-# Add the scripts directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'dot_github_folder' / 'scripts'))
 
 from section_extractor import (
     strip_callout_boxes,
@@ -0,0 +1,455 @@
+"""
+Tests for scripts/validate_config.py - config/rubric/guidance validation CLI helpers.
+
+Covers YAML loading and exit code classification. All tests work on files
+written to tmp_path, so they are fully deterministic.
+"""
+
+import json
+import os
+import pytest
+import sys
+
+from validate_config import (
+    ValidationCache,
+    load_yaml_file,
+    main,
+    print_summary,
+    validate_config_file,
+    validate_many,
+)
+from validation_schemas import ConfigSchema, GuidanceSchema, RubricSchema, ValidationError
+
+
+@pytest.mark.deterministic
+@pytest.mark.unit
+class TestLoadYamlFile:
+    """Tests for YAML loading and error tagging."""
+
+    def test_valid_yaml(self, tmp_path):
+        """Test that valid YAML is parsed with no errors."""
+        path = tmp_path / "config.yml"
+        path.write_text("model:\n  primary: gpt-4o\n")
+
+        content, errors = load_yaml_file(path)
+
+        assert content == {"model": {"primary": "gpt-4o"}}
+        assert not errors
+
+    def test_syntax_error_is_tagged(self, tmp_path):
+        """Test that YAML syntax errors carry the syntax code and line."""
+        path = tmp_path / "config.yml"
+        path.write_text("a: [1,\n")
+
+        content, errors = load_yaml_file(path)
+
+        assert content == {}
+        assert len(errors) == 1
+        assert errors[0].code == ValidationError.YAML_SYNTAX
+        assert errors[0].line == 2
+
+    def test_missing_file_is_tagged(self, tmp_path):
+        """Test that a missing file carries the file-not-found code."""
+        content, errors = load_yaml_file(tmp_path / "missing.yml")
+
+        assert content == {}
+        assert errors[0].code == ValidationError.FILE_NOT_FOUND
+
+    def test_empty_file(self, tmp_path):
+        """Test that an empty file is an error but not a syntax error."""
+        path = tmp_path / "rubric.yml"
+        path.write_text("# only a comment\n")
+
+        content, errors = load_yaml_file(path)
+
+        assert content == {}
+        assert "empty" in errors[0].message
+        assert errors[0].code is None
+
+
+@pytest.mark.deterministic
+@pytest.mark.unit
+class TestValidateMany:
+    """Tests for batch validation across config directories."""
+
+    def test_results_keyed_by_directory(self, tmp_path):
+        """Test that each directory gets its own per-file results."""
+        good = tmp_path / "good"
+        bad = tmp_path / "bad"
+        for config_dir in (good, bad):
+            config_dir.mkdir()
+            (config_dir / "guidance.md").write_text("Be specific. " * 20)
+        (good / "config.yml").write_text("report_file: index.qmd\nmodel:\n  primary: gpt-4o\n")
+        (bad / "config.yml").write_text("a: [1,\n")
+
+        results = validate_many([good, bad], max_workers=2)
+
+        assert list(results) == [good, bad]
+        assert list(results[good]) == ["config.yml", "rubric.yml", "guidance.md"]
+        assert all(e.severity == ValidationError.WARNING for e in results[good]["config.yml"])
+        assert results[bad]["config.yml"][0].code == ValidationError.YAML_SYNTAX
+        assert results[bad]["guidance.md"] == []
+
+
+@pytest.mark.deterministic
+@pytest.mark.unit
+class TestValidationCache:
+    """Tests for the on-disk per-file results cache."""
+
+    @pytest.fixture
+    def counted_validate(self):
+        """A validator that records how often it actually runs."""
+        calls = []
+
+        def validate(data=None):
+            calls.append(data)
+            return [ValidationError(ValidationError.WARNING, "config.yml", "'max_input_tokens' is not set")]
+
+        validate.calls = calls
+        return validate
+
+    def run(self, cache_path, file_path, validate):
+        """Validate through a fresh cache instance, as a new process would."""
+        cache = ValidationCache(path=cache_path)
+        errors = cache.lookup_or_validate(file_path, validate)
+        cache.save()
+        return errors
+
+    def test_unchanged_file_hits(self, tmp_path, counted_validate):
+        """Test that a second run reuses the stored errors without validating."""
+        file_path = tmp_path / "config.yml"
+        file_path.write_text("model:\n  primary: gpt-4o\n")
+        cache_path = tmp_path / "cache" / "results.json"
+
+        first = self.run(cache_path, file_path, counted_validate)
+        second = self.run(cache_path, file_path, counted_validate)
+
+        assert len(counted_validate.calls) == 1
+        assert [e.to_dict() for e in second] == [e.to_dict() for e in first]
+
+    def test_content_change_misses(self, tmp_path, counted_validate):
+        """Test that rewriting the file with new contents revalidates it."""
+        file_path = tmp_path / "config.yml"
+        file_path.write_text("model:\n  primary: gpt-4o\n")
+        cache_path = tmp_path / "results.json"
+
+        self.run(cache_path, file_path, counted_validate)
+        file_path.write_text("model:\n  primary: gpt-5\n  fallback: gpt-4o\n")
+        self.run(cache_path, file_path, counted_validate)
+
+        assert len(counted_validate.calls) == 2
+
+    @pytest.mark.parametrize("cache_text", ["not json {", "[1, 2]", '{"%s": {"code": null, "stat": "x"}}'])
+    def test_malformed_cache_revalidates(self, tmp_path, counted_validate, cache_text):
+        """Test that a damaged cache file or entry is ignored and then rewritten."""
+        file_path = tmp_path / "config.yml"
+        file_path.write_text("model:\n  primary: gpt-4o\n")
+        cache_path = tmp_path / "results.json"
+        cache_path.write_text(cache_text.replace("%s", str(file_path.resolve())))
+
+        errors = self.run(cache_path, file_path, counted_validate)
+        self.run(cache_path, file_path, counted_validate)
+
+        assert errors[0].severity == ValidationError.WARNING
+        assert len(counted_validate.calls) == 1
+
+    def test_touched_file_with_same_bytes_hits(self, tmp_path, counted_validate):
+        """Test that a new mtime alone (e.g. a fresh checkout) falls back to the content hash."""
+        file_path = tmp_path / "config.yml"
+        file_path.write_text("model:\n  primary: gpt-4o\n")
+        cache_path = tmp_path / "results.json"
+
+        self.run(cache_path, file_path, counted_validate)
+        st = file_path.stat()
+        os.utime(file_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.run(cache_path, file_path, counted_validate)
+        self.run(cache_path, file_path, counted_validate)  # Stat stored again, so a plain hit
+
+        assert len(counted_validate.calls) == 1
+        entry = json.loads(cache_path.read_text())[str(file_path.resolve())]
+        assert entry["stat"] == [st.st_mtime_ns + 10**9, st.st_size]
+
+    def test_touched_file_with_new_bytes_misses(self, tmp_path, counted_validate):
+        """Test that same-size but different contents miss even though only the mtime differs."""
+        file_path = tmp_path / "config.yml"
+        file_path.write_text("model:\n  primary: gpt-4o\n")
+        cache_path = tmp_path / "results.json"
+
+        self.run(cache_path, file_path, counted_validate)
+        st = file_path.stat()
+        file_path.write_text("model:\n  primary: gpt-5o\n")
+        os.utime(file_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.run(cache_path, file_path, counted_validate)
+
+        assert file_path.stat().st_size == st.st_size
+        assert len(counted_validate.calls) == 2
+
+    def test_code_change_misses(self, tmp_path, counted_validate, monkeypatch):
+        """Test that entries written by a different version of the validator are not reused."""
+        file_path = tmp_path / "config.yml"
+        file_path.write_text("model:\n  primary: gpt-4o\n")
+        cache_path = tmp_path / "results.json"
+
+        self.run(cache_path, file_path, counted_validate)
+        monkeypatch.setattr(ValidationCache, "_code_stamp", lambda self: "changed-rules")
+        self.run(cache_path, file_path, counted_validate)
+
+        assert len(counted_validate.calls) == 2
+
+    def test_code_stamp_covers_yaml_version_and_loader(self, tmp_path, monkeypatch):
+        """Test that a PyYAML upgrade or a different loader changes the code stamp."""
+        import yaml
+
+        class OtherLoader:
+            pass
+
+        stamp = ValidationCache(path=tmp_path / "results.json")._code_stamp()
+
+        monkeypatch.setattr(yaml, "__version__", "0.0-test")
+        upgraded = ValidationCache(path=tmp_path / "results.json")._code_stamp()
+        monkeypatch.setattr("validate_config._safe_loader", lambda: OtherLoader)
+        other_loader = ValidationCache(path=tmp_path / "results.json")._code_stamp()
+
+        assert len({stamp, upgraded, other_loader}) == 3
+
+    def test_validates_the_hashed_bytes(self, tmp_path, counted_validate):
+        """Test that validation runs on the bytes read for the digest, not a second read."""
+        file_path = tmp_path / "config.yml"
+        file_path.write_text("model:\n  primary: gpt-4o\n")
+        cache_path = tmp_path / "results.json"
+
+        self.run(cache_path, file_path, counted_validate)
+
+        assert counted_validate.calls == [file_path.read_bytes()]
+        entry = json.loads(cache_path.read_text())[str(file_path.resolve())]
+        assert entry["digest"] == ValidationCache._digest(file_path.read_bytes())
+
+
+@pytest.mark.deterministic
+@pytest.mark.unit
+class TestPrintSummary:
+    """Tests for exit code selection."""
+
+    def test_all_valid(self, capsys):
+        """Test that no errors gives exit code 0."""
+        assert print_summary({"config.yml": [], "rubric.yml": []}) == 0
+
+    def test_syntax_error_exit_code(self, capsys):
+        """Test that a syntax error gives exit code 1, classified by code not message."""
+        error = ValidationError(
+            ValidationError.ERROR, "config.yml", "reworded message", code=ValidationError.YAML_SYNTAX
+        )
+        assert print_summary({"config.yml": [error]}) == 1
+
+    def test_schema_error_exit_code(self, capsys):
+        """Test that an untagged error gives exit code 2."""
+        error = ValidationError(ValidationError.ERROR, "config.yml", "'model' section is required")
+        assert print_summary({"config.yml": [error]}) == 2
+
+    def test_warnings_pass_unless_strict(self, capsys):
+        """Test that warnings only fail in strict mode."""
+        warning = ValidationError(ValidationError.WARNING, "config.yml", "'max_input_tokens' is not set")
+
+        assert print_summary({"config.yml": [warning]}) == 0
+        assert print_summary({"config.yml": [warning]}, strict=True) == 2
+
+    def test_quiet_omits_individual_errors(self, capsys):
+        """Test that quiet mode keeps file status but drops each error line."""
+        error = ValidationError(ValidationError.ERROR, "config.yml", "'model' section is required")
+
+        exit_code = print_summary({"config.yml": [error]}, quiet=True)
+        output = capsys.readouterr().out
+
+        assert exit_code == 2
+        assert "config.yml: 1 error(s)" in output
+        assert "'model' section is required" not in output
+
+    def test_json_report(self, capsys):
+        """Test that JSON mode prints a parseable report with the exit code."""
+        error = ValidationError(
+            ValidationError.ERROR, "config.yml", "YAML syntax error", line=3, code=ValidationError.YAML_SYNTAX
+        )
+
+        exit_code = print_summary({"config.yml": [error], "rubric.yml": []}, as_json=True)
+        report = json.loads(capsys.readouterr().out)
+
+        assert exit_code == 1
+        assert report["exit_code"] == 1
+        assert report["errors"] == 1
+        assert report["files"]["rubric.yml"] == []
+        assert report["files"]["config.yml"][0]["line"] == 3
+        assert report["files"]["config.yml"][0]["code"] == ValidationError.YAML_SYNTAX
+
+
+@pytest.mark.deterministic
+@pytest.mark.unit
+class TestMain:
+    """Tests for the command-line entry point."""
+
+    def run_main(self, monkeypatch, capsys, config_dir, *flags):
+        """Run main() with --json and no cache; return (exit_code, report)."""
+        argv = ["validate_config.py", "--config-dir", str(config_dir), "--json", "--no-cache", *flags]
+        monkeypatch.setattr(sys, "argv", argv)
+        exit_code = main()
+        return exit_code, json.loads(capsys.readouterr().out)
+
+    def test_listed_files_are_validated(self, tmp_path, monkeypatch, capsys):
+        """Test that files found by the directory listing are validated in report order."""
+        (tmp_path / "config.yml").write_text("report_file: index.qmd\nmodel:\n  primary: gpt-4o\n")
+        (tmp_path / "guidance.md").write_text("Be specific. " * 20)
+
+        exit_code, report = self.run_main(monkeypatch, capsys, tmp_path)
+
+        assert list(report["files"]) == ["config.yml", "rubric.yml", "guidance.md"]
+        assert report["files"]["rubric.yml"][0]["code"] == ValidationError.FILE_NOT_FOUND
+        assert report["files"]["guidance.md"] == []
+        assert exit_code == report["exit_code"] == 1
+
+    @pytest.mark.parametrize("flags,expected_files", [
+        ((), ["config.yml", "rubric.yml", "guidance.md"]),
+        (("--fail-fast",), ["config.yml"]),
+    ])
+    def test_fail_fast_stops_at_first_unparseable_file(
+        self, tmp_path, monkeypatch, capsys, flags, expected_files
+    ):
+        """Test that --fail-fast skips the files after the first syntax error."""
+        (tmp_path / "config.yml").write_text("a: [1,\n")
+        (tmp_path / "guidance.md").write_text("Be specific. " * 20)
+
+        exit_code, report = self.run_main(monkeypatch, capsys, tmp_path, *flags)
+
+        assert list(report["files"]) == expected_files
+        assert report["files"]["config.yml"][0]["code"] == ValidationError.YAML_SYNTAX
+        assert exit_code == 1
+
+    def test_fail_fast_runs_everything_when_files_parse(self, tmp_path, monkeypatch, capsys):
+        """Test that --fail-fast still validates every file when none fails to parse."""
+        (tmp_path / "config.yml").write_text("report_file: index.qmd\nmodel:\n  primary: gpt-4o\n")
+        (tmp_path / "rubric.yml").write_text("criteria: []\n")
+        (tmp_path / "guidance.md").write_text("Be specific. " * 20)
+
+        exit_code, report = self.run_main(monkeypatch, capsys, tmp_path, "--fail-fast")
+
+        assert list(report["files"]) == ["config.yml", "rubric.yml", "guidance.md"]
+        assert exit_code == 2  # rubric.yml parses but fails the schema
+
+    def test_missing_directory(self, tmp_path, monkeypatch, capsys):
+        """Test that a missing config directory is reported as a file_not_found error."""
+        missing = tmp_path / "missing"
+        exit_code, report = self.run_main(monkeypatch, capsys, missing)
+
+        assert exit_code == 1
+        assert report["exit_code"] == 1
+        [error] = report["files"][str(missing)]
+        assert error["code"] == ValidationError.FILE_NOT_FOUND
+        assert "not found" in error["message"]
+
+    def test_missing_directory_text_shows_expected_structure(self, tmp_path, monkeypatch, capsys):
+        """Test that the text report for a missing directory still shows the expected layout."""
+        missing = tmp_path / "missing"
+        monkeypatch.setattr(sys, "argv", ["validate_config.py", "--config-dir", str(missing), "--no-cache"])
+
+        assert main() == 1
+        out = capsys.readouterr().out
+        assert "Configuration directory not found" in out
+        assert "Expected structure:" in out
+
+    def test_unreadable_directory_is_reported(self, tmp_path, monkeypatch, capsys):
+        """Test that a directory that can't be listed is a validation error, not a traceback."""
+        def deny(path):
+            raise PermissionError(13, "Permission denied", str(path))
+
+        monkeypatch.setattr("validate_config.os.scandir", deny)
+        exit_code, report = self.run_main(monkeypatch, capsys, tmp_path)
+
+        assert exit_code == report["exit_code"] == 2
+        [errors] = report["files"].values()
+        assert errors[0]["message"] == "Cannot read configuration directory: Permission denied"
+
+
+@pytest.mark.deterministic
+@pytest.mark.unit
+class TestGuidanceSchema:
+    """Tests for guidance.md content checks."""
+
+    def test_empty_guidance_is_error(self):
+        """Test that whitespace-only guidance is an error."""
+        errors = GuidanceSchema.validate_bytes(b"  \n\n")
+
+        assert errors[0].severity == ValidationError.ERROR
+
+    def test_short_guidance_counts_characters(self):
+        """Test that the length warning counts characters, not bytes."""
+        errors = GuidanceSchema.validate_bytes("é".encode("utf-8") * 60)
+
+        assert errors[0].severity == ValidationError.WARNING
+        assert "60 characters" in errors[0].message
+
+    def test_crlf_guidance_counts_like_lf(self):
+        """Test that CRLF line endings are counted as single newlines, as text-mode reads do."""
+        errors = GuidanceSchema.validate_bytes(b"line\r\n" * 18)
+
+        assert errors[0].severity == ValidationError.WARNING
+        assert "89 characters" in errors[0].message
+
+    def test_missing_guidance_is_tagged(self, tmp_path):
+        """Test that a missing guidance.md carries the file-not-found code."""
+        errors = GuidanceSchema.validate(str(tmp_path / "guidance.md"))
+
+        assert errors[0].code == ValidationError.FILE_NOT_FOUND
+
+
+@pytest.mark.deterministic
+@pytest.mark.unit
+class TestConfigSchema:
+    """Tests for config.yml schema checks."""
+
+    def test_unknown_model_is_warning(self):
+        """Test that an unrecognized model name only warns."""
+        config = {"report_file": "index.qmd", "model": {"primary": "not-a-model"}}
+
+        errors = ConfigSchema.validate(config)
+
+        assert any(
+            e.severity == ValidationError.WARNING and "not-a-model" in e.message for e in errors
+        )
+
+    def test_unhashable_model_is_reported_not_raised(self):
+        """Test that a list where a model name belongs is reported as unknown."""
+        config = {"report_file": "index.qmd", "model": {"primary": ["gpt-4o", "gpt-5"]}}
+
+        errors = ConfigSchema.validate(config)
+
+        assert any("unknown model" in e.message for e in errors)
+
+    @pytest.mark.parametrize("text", ["- report_file: index.qmd\n- model: gpt-4o\n", "just a string\n"])
+    def test_non_mapping_config_is_schema_error(self, tmp_path, text, capsys):
+        """Test that a top-level list or scalar is reported, not raised, and exits 2."""
+        (tmp_path / "config.yml").write_text(text)
+
+        errors = validate_config_file(tmp_path)
+
+        assert len(errors) == 1
+        assert errors[0].severity == ValidationError.ERROR
+        assert "mapping" in errors[0].message
+        assert print_summary({"config.yml": errors}) == 2
+
+
+@pytest.mark.deterministic
+@pytest.mark.unit
+class TestRubricSchema:
+    """Tests for rubric.yml schema checks."""
+
+    def test_duplicate_ids_reported_once(self):
+        """Test that a repeated id gives one error listing every position."""
+        criterion = {"name": "Results", "weight": 25, "description": "d", "levels": {}}
+        rubric = {
+            "assignment": {"name": "Lab 1", "course": "PHYS-280", "total_points": 100},
+            "criteria": [dict(criterion, id=cid) for cid in ("a", "b", "a", "a")],
+        }
+
+        errors = RubricSchema.validate(rubric)
+        duplicates = [e for e in errors if "Duplicate id" in e.message]
+
+        assert len(duplicates) == 1
+        assert duplicates[0].message == "Duplicate id 'a' used by criteria 1, 3, 4"
@@ -6,11 +6,6 @@ or external systems.
 """
 
 import pytest
-import sys
-from pathlib import Path
-
-# Add the scripts directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'dot_github_folder' / 'scripts'))
 
 from validate_feedback_setup import (
     validate_vision_config,